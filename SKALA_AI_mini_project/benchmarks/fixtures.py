@@ -0,0 +1,156 @@
+import os
+import time
+import zlib
+import hashlib
+
+import numpy as np
+import pandas as pd
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.output_parsers import StrOutputParser
+
+# ✅ 벤치마크용 고정 입력 (네트워크/API 키 없이 재현 가능한 결과를 위해 모두 결정적으로 생성)
+SYNTHETIC_ANCHOR = "2000-01-03"  # 합성 주가 시계열의 시작일 (증분 수집 시에도 같은 날짜는 같은 값)
+EMBEDDING_SIZE = 384
+
+COMPANY_TEXT = (
+    "{company}는 전기차용 이차전지와 ESS 배터리를 생산합니다. {company}의 2024년 매출은 {revenue}조 원이며 "
+    "하이니켈 양극재와 46파이 원통형 셀 양산을 준비하고 있습니다. 북미 합작 공장과 LFP 라인 투자로 "
+    "{company}의 점유율은 {share}%로 예상됩니다."
+)
+MARKET_TEXT = (
+    "배터리 산업 동향 {i}: 전기차 수요 둔화에도 ESS 수요가 늘면서 LFP 배터리 비중이 {share}%까지 확대되었습니다. "
+    "리튬 가격은 전년 대비 {change}% 변동했고, 전고체 배터리 상용화 시점은 {year}년으로 전망됩니다."
+)
+
+
+def company_names(count: int) -> dict:
+    """
+    벤치마크용 watchlist (기업명 -> 티커). 앞의 세 기업은 실제 분석 대상과 같은 이름을 사용합니다.
+    """
+    base = {"삼성 SDI": "006400.KS", "LG에너지솔루션": "373220.KS", "동원시스템즈": "014820.KS"}
+    names = dict(list(base.items())[:count])
+    for i in range(len(names), count):
+        names[f"BENCH{i:03d}"] = f"BENCH{i:03d}.KS"
+    return names
+
+
+def synthetic_ohlcv(ticker: str, periods: int = None, end=None) -> pd.DataFrame:
+    """
+    티커별 시드로 만든 기하 브라운 운동 OHLCV. 같은 티커/날짜는 항상 같은 값을 가집니다.
+
+    Args:
+        ticker (str): 시드로 사용할 티커
+        periods (int): SYNTHETIC_ANCHOR부터의 영업일 수 (없으면 end까지)
+        end: 종료 날짜 (기본값: 오늘)
+    """
+    if periods is not None:
+        index = pd.bdate_range(SYNTHETIC_ANCHOR, periods=periods)
+    else:
+        index = pd.bdate_range(SYNTHETIC_ANCHOR, end=end or pd.Timestamp.today().normalize())
+    rng = np.random.default_rng(zlib.crc32(ticker.encode("utf-8")))
+    returns = rng.normal(0.0003, 0.02, len(index))
+    close = 50_000 * np.exp(np.cumsum(returns))
+    spread = np.abs(rng.normal(0, 0.01, len(index))) * close
+    df = pd.DataFrame({
+        "Close": close,
+        "High": close + spread,
+        "Low": close - spread,
+        "Open": close * (1 + rng.normal(0, 0.005, len(index))),
+        "Volume": rng.integers(100_000, 2_000_000, len(index)).astype("float64"),
+    }, index=index)
+    df.index.name = "Date"
+    df.columns.name = "Price"
+    return df
+
+
+class SyntheticSource:
+    """
+    YFinanceSource 대신 사용하는 오프라인 데이터 소스 (PriceStore(source=...)에 주입).
+    """
+
+    def fetch(self, ticker: str, start=None, end=None, interval: str = "1d") -> pd.DataFrame:
+        df = synthetic_ohlcv(ticker, end=pd.Timestamp(end) - pd.Timedelta(days=1) if end else None)
+        return df[df.index >= pd.Timestamp(start)] if start else df
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    ChatOpenAI 대신 사용하는 결정적 채팅 모델. 프롬프트 해시로 응답을 만들고 토큰 사용량(문자 수/4)을 보고하며,
+    latency로 API 지연을 흉내 낼 수 있습니다.
+    """
+
+    model_name: str = "fake-chat"
+    temperature: float = 0.0
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = "".join(str(message.content) for message in messages)
+        if self.latency:
+            time.sleep(self.latency)
+        text = f"[fake analysis] {len(prompt)} chars, digest {hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]}"
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+
+def use_fake_llm(latency: float = 0.0):
+    """
+    세 에이전트의 체인을 `프롬프트 | FakeChatModel | 파서`로 교체합니다.
+    """
+    from src.agents import company_analysis, market_analysis, stock_price_predictor
+
+    fake = FakeChatModel(latency=latency)
+    company_analysis.company_analysis_chain = company_analysis.company_analysis_chain.first | fake | StrOutputParser()
+    market_analysis.battery_analysis_chain = market_analysis.battery_analysis_chain.first | fake | StrOutputParser()
+    stock_price_predictor.stock_chain = stock_price_predictor.stock_chain.first | fake | StrOutputParser()
+    return fake
+
+
+def use_synthetic_prices(root: str):
+    """
+    전역 PriceStore를 합성 데이터 소스를 쓰는 임시 저장소로 교체합니다.
+    """
+    from src.fetcher import price_store
+
+    price_store._default_store = price_store.PriceStore(root=root, source=SyntheticSource())
+    return price_store._default_store
+
+
+def build_chroma_fixture(root: str, companies, docs_per_company: int = 20, market_docs: int = 40) -> dict:
+    """
+    결정적 가짜 임베딩으로 company/battery 벡터 DB를 만듭니다. 문서는 root 아래 텍스트 파일로 생성해
+    실제 수집 파이프라인(build_vectorstore)을 그대로 사용합니다.
+
+    Returns:
+        dict: 벡터 DB 이름 -> build_vectorstore 통계
+    """
+    from src.utils import vectorstore_registry
+    from src.ingestion.build_vectorstore import build_vectorstore
+
+    vectorstore_registry._embeddings = DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+    os.environ["COMPANY_DB_PATH"] = os.path.join(root, "company_db")
+    os.environ["BATTERY_DB_PATH"] = os.path.join(root, "battery_db")
+
+    company_dir = os.path.join(root, "company_docs")
+    market_dir = os.path.join(root, "battery_docs")
+    os.makedirs(company_dir, exist_ok=True)
+    os.makedirs(market_dir, exist_ok=True)
+    for c, company in enumerate(companies):
+        for i in range(docs_per_company):
+            with open(os.path.join(company_dir, f"company_{c:03d}_{i:03d}.txt"), "w", encoding="utf-8") as f:
+                f.write(COMPANY_TEXT.format(company=company, revenue=10 + i, share=5 + (c + i) % 30))
+    for i in range(market_docs):
+        with open(os.path.join(market_dir, f"market_{i:03d}.txt"), "w", encoding="utf-8") as f:
+            f.write(MARKET_TEXT.format(i=i, share=20 + i % 50, change=-30 + i % 60, year=2027 + i % 5))
+
+    return {
+        "company": build_vectorstore("company", company_dir),
+        "battery": build_vectorstore("battery", market_dir),
+    }
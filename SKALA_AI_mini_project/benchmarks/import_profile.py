@@ -0,0 +1,103 @@
+"""
+시작 시간 프로파일: 모듈마다 새 인터프리터에서 `python -X importtime`으로 임포트해 모듈/패키지별 임포트 비용을
+보고합니다. CLI/테스트/API 워커 시작이 느려졌을 때 원인 패키지를 찾는 데 사용합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.import_profile                          # supervisor, API 서버, 에이전트 모듈
+    python -m benchmarks.import_profile src.agents.supervisor --top 30
+    python -m benchmarks.import_profile src.agents.supervisor src.api.server --budget 1.0  # 예산(초) 초과 시 종료 코드 1
+"""
+import os
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# 시작 경로(CLI/API)는 빨라야 하고, 에이전트 모듈은 노드 첫 실행 시 한 번 치르는 비용
+DEFAULT_MODULES = [
+    "src.agents.supervisor",
+    "src.api.server",
+    "src.agents.market_analysis",
+    "src.agents.company_analysis",
+    "src.agents.stock_price_predictor",
+    "src.agents.data_visualizer",
+    "src.agents.report_generator",
+]
+
+
+def profile_import(module: str) -> dict:
+    """
+    새 인터프리터에서 모듈을 임포트하고 -X importtime 출력을 파싱합니다.
+
+    Returns:
+        dict: {"module", "seconds": 대상 모듈 누적 임포트 시간, "modules": [(이름, self 초, 누적 초)],
+            "packages": 최상위 패키지 -> self 초 합계} 또는 {"module", "error"}
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get("PYTHONPATH")]))}
+    env.setdefault("OPENAI_API_KEY", "sk-import-profile")  # ChatOpenAI 생성용 (호출은 하지 않음)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"module": module, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+
+    packages = defaultdict(float)
+    for name, self_s, _ in modules:
+        packages[name.split(".")[0]] += self_s
+    seconds = next((cumulative for name, _, cumulative in modules if name == module), 0.0)
+    return {"module": module, "seconds": seconds, "modules": modules, "packages": dict(packages)}
+
+
+def format_profile(profile: dict, top: int) -> str:
+    """
+    프로파일 결과를 터미널 출력용 표로 만듭니다. (패키지별 self 시간 합계, 누적 시간이 큰 모듈)
+    """
+    if "error" in profile:
+        return f"{profile['module']}: 임포트 실패 ({profile['error']})"
+
+    lines = [f"{profile['module']}: {profile['seconds']:.3f}s ({len(profile['modules'])} modules)"]
+    lines.append(f"  {'package':<40}{'self(s)':>10}")
+    for package, seconds in sorted(profile["packages"].items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {package[:39]:<40}{seconds:>10.3f}")
+    lines.append(f"  {'module':<40}{'self(s)':>10}{'cum(s)':>10}")
+    for name, self_s, cumulative in sorted(profile["modules"], key=lambda item: -item[2])[:top]:
+        lines.append(f"  {name[:39]:<40}{self_s:>10.3f}{cumulative:>10.3f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈별 임포트 비용 프로파일")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="프로파일할 모듈 (기본값: 시작 경로와 에이전트 모듈)")
+    parser.add_argument("--top", type=int, default=10, help="표에 표시할 패키지/모듈 수")
+    parser.add_argument("--budget", type=float, help="모듈별 임포트 시간 예산(초). 넘으면 종료 코드 1")
+    args = parser.parse_args(argv)
+
+    profiles = [profile_import(module) for module in args.modules]
+    for profile in profiles:
+        print(format_profile(profile, args.top))
+        print()
+
+    print(f"{'module':<40}{'import(s)':>10}")
+    for profile in profiles:
+        seconds = f"{profile['seconds']:.3f}" if "error" not in profile else "error"
+        print(f"{profile['module'][:39]:<40}{seconds:>10}")
+
+    if args.budget is not None:
+        over = [p["module"] for p in profiles if "error" in p or p["seconds"] > args.budget]
+        if over:
+            print(f"예산 {args.budget:.2f}s 초과: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+오프라인 벤치마크: OpenAI/yfinance/임베딩 모델 없이 결정적인 대체 입력으로 단계별/전체 파이프라인 시간을 측정하고
+결과를 JSON으로 저장합니다. 커밋 간 비교에 사용합니다.
+
+사용법 (프로젝트 루트에서):
+    python -m benchmarks.run_benchmarks                       # 기본 축
+    python -m benchmarks.run_benchmarks --quick               # 빠른 확인용 (작은 축, 1회 반복)
+    python -m benchmarks.run_benchmarks --tickers 1,3,8 --history 250,1000 --top-k 3,10 --repeats 5
+    python -m benchmarks.run_benchmarks --stages retrieval,graph_invoke --output results.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+# ✅ 에이전트 모듈을 임포트하기 전에 오프라인 설정을 적용 (모듈 로드 시 환경 변수를 읽음)
+BENCH_ROOT = tempfile.mkdtemp(prefix="skala-bench-")
+os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")  # ChatOpenAI 생성용 (호출은 하지 않음)
+os.environ["LLM_CACHE_BYPASS"] = "1"                             # 매번 (가짜) LLM을 호출해 체인 비용까지 측정
+os.environ["FORECAST_EXPORT"] = "0"
+os.environ["VIZ_OUTPUT_DIR"] = os.path.join(BENCH_ROOT, "output")
+os.environ["METRICS_DIR"] = os.path.join(BENCH_ROOT, "metrics")
+os.environ["MODEL_REGISTRY_DIR"] = os.path.join(BENCH_ROOT, "registry")
+
+import numpy as np
+import torch
+
+from benchmarks.fixtures import (
+    company_names, synthetic_ohlcv, use_fake_llm, use_synthetic_prices, build_chroma_fixture,
+)
+
+STAGES = ["prepare_data", "transformer_forecast", "global_forecast", "predict_future", "retrieval", "visualization", "report",
+          "graph_invoke"]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SEED = 0
+
+
+def parse_axis(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def measure(stage: str, params: dict, fn, repeats: int, warmup: int = 1, **extra):
+    """
+    fn을 warmup회 실행한 뒤 repeats회 측정합니다.
+
+    Returns:
+        dict: 단계명, 축 값, 반복별 시간(초)과 통계
+    """
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    result = {
+        "stage": stage,
+        "params": params,
+        "repeats": repeats,
+        "times_s": times,
+        "mean_s": statistics.fmean(times),
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "stdev_s": statistics.stdev(times) if len(times) > 1 else 0.0,
+        **extra,
+    }
+    print(f"{stage:<22}{json.dumps(params, ensure_ascii=False):<36}median {result['median_s'] * 1000:10.2f} ms")
+    return result
+
+
+def bench_prepare_data(args):
+    from src.models.stock_predictor_model import prepare_data
+
+    for history in args.history:
+        df = synthetic_ohlcv("BENCH.KS", periods=history)
+        yield measure("prepare_data", {"history": history}, lambda: prepare_data(df, window_size=30), args.repeats)
+
+
+def bench_transformer_forecast(args):
+    from src.models.stock_predictor_model import transformer_forecast
+
+    for history in args.history:
+        df = synthetic_ohlcv("BENCH.KS", periods=history)
+
+        def run():
+            torch.manual_seed(SEED)
+            return transformer_forecast(df, epochs=args.epochs, return_metrics=True)
+
+        _, metrics = run()
+        yield measure("transformer_forecast", {"history": history, "epochs": args.epochs}, run, args.repeats,
+                      warmup=0, epochs_run=len(metrics["epochs"]))
+
+
+def bench_global_forecast(args):
+    from src.models.stock_predictor_model import global_forecast
+
+    history = args.history[0]
+    for tickers in args.tickers:
+        frames = {company: synthetic_ohlcv(ticker, periods=history) for company, ticker in company_names(tickers).items()}
+
+        def run():
+            torch.manual_seed(SEED)
+            return global_forecast(frames, epochs=args.epochs)
+
+        yield measure("global_forecast", {"tickers": tickers, "history": history, "epochs": args.epochs}, run,
+                      args.repeats, warmup=0)
+
+
+def bench_predict_future(args):
+    from src.models.stock_predictor_model import TransformerModel, forecast_sequences
+
+    torch.manual_seed(SEED)
+    model = TransformerModel(input_dim=1)
+    for tickers in args.tickers:
+        sequences = torch.rand(tickers, 30, 1, generator=torch.Generator().manual_seed(SEED))
+        yield measure("predict_future", {"tickers": tickers, "horizon": 30},
+                      lambda: forecast_sequences(model, sequences, horizon=30), args.repeats)
+
+
+def bench_retrieval(args):
+    from src.agents.company_analysis import retrieve_company_documents
+    from src.utils.vectorstore_registry import get_vector_store
+
+    company_db, battery_db = get_vector_store("company"), get_vector_store("battery")
+    for tickers in args.tickers:
+        companies = list(company_names(tickers))
+        for top_k in args.top_k:
+            def run():
+                retrieve_company_documents(company_db, top_k=top_k, companies=companies)
+                battery_db.similarity_search("배터리 산업", k=top_k)
+
+            yield measure("retrieval", {"tickers": tickers, "top_k": top_k}, run, args.repeats)
+
+
+def forecast_state(tickers: int, horizon: int = 30) -> dict:
+    from src.agents.stock_price_predictor import forecast_dates
+
+    forecast_data = {}
+    for company, ticker in company_names(tickers).items():
+        history = synthetic_ohlcv(ticker, periods=250)
+        forecast_data[company] = {
+            "dates": forecast_dates(history.index[-1], horizon),
+            "values": history["Close"].to_numpy()[-horizon:],
+        }
+    return forecast_data
+
+
+def bench_visualization(args):
+    from src.agents.data_visualizer import render_charts, forecast_key
+
+    chart_dir = os.path.join(BENCH_ROOT, "charts")
+    os.makedirs(chart_dir, exist_ok=True)
+    for tickers in args.tickers:
+        jobs = {
+            company: (forecast, os.path.join(chart_dir, f"{company}.png"), forecast_key(forecast))
+            for company, forecast in forecast_state(tickers).items()
+        }
+        yield measure("visualization", {"tickers": tickers}, lambda: render_charts(jobs), args.repeats)
+
+
+def bench_report(args):
+    from src.agents import report_generator
+    from src.agents.data_visualizer import render_charts, forecast_key
+
+    try:
+        import weasyprint  # noqa: F401
+        with_pdf = True
+    except ImportError:
+        with_pdf = False
+        logging.warning("weasyprint가 없어 PDF를 제외한 Markdown/HTML 렌더링만 측정합니다.")
+
+    chart_dir = os.path.join(BENCH_ROOT, "report_charts")
+    os.makedirs(chart_dir, exist_ok=True)
+    for tickers in args.tickers:
+        forecast_data = forecast_state(tickers)
+        jobs = {
+            company: (forecast, os.path.join(chart_dir, f"{company}.png"), forecast_key(forecast))
+            for company, forecast in forecast_data.items()
+        }
+        state = {
+            "company_data": {company: "[fake analysis] " * 40 for company in forecast_data},
+            "market_data": {"keyword": "배터리 산업", "analysis": "[fake analysis] " * 80},
+            "stock_data": {company: "[fake analysis] " * 20 for company in forecast_data},
+            "forecast_data": forecast_data,
+            "visualization_data": render_charts(jobs),
+            "run_config": {"report_dir": os.path.join(BENCH_ROOT, "reports", str(tickers))},
+        }
+
+        if with_pdf:
+            def run():
+                report = report_generator.generate_report(state)["report"]
+                if "error" in report:
+                    raise RuntimeError(report["error"])
+        else:
+            def run():
+                output_dir = state["run_config"]["report_dir"]
+                os.makedirs(output_dir, exist_ok=True)
+                intro = report_generator.generate_intro(state)
+                visualization = state["visualization_data"]
+                markdown_text = report_generator.build_markdown(
+                    state, intro, report_generator.format_visualization(visualization, relative_to=output_dir))
+                html_body = report_generator.markdown2.markdown(report_generator.build_markdown(
+                    state, intro, report_generator.format_visualization(visualization, inline=True)))
+                report_generator.write_text(os.path.join(output_dir, "report.md"), markdown_text)
+                report_generator.write_text(os.path.join(output_dir, "report.html"), report_generator.wrap_html(html_body))
+
+        yield measure("report", {"tickers": tickers, "pdf": with_pdf}, run, args.repeats)
+
+
+def bench_graph_invoke(args):
+    from src.agents.supervisor import graph
+    from src.models import model_registry
+    from src.utils.instrumentation import get_run_metrics
+
+    for tickers in args.tickers:
+        watchlist = company_names(tickers)
+        # 설정마다 빈 주가 저장소/모델 레지스트리로 시작: 첫 실행(cold)은 수집+학습, 이후(warm)는 재사용 경로
+        case_root = os.path.join(BENCH_ROOT, f"graph-{tickers}")
+        use_synthetic_prices(os.path.join(case_root, "raw"))
+        os.environ["MODEL_REGISTRY_DIR"] = os.path.join(case_root, "registry")
+        model_registry._default_registry = model_registry.ModelRegistry(os.environ["MODEL_REGISTRY_DIR"])
+
+        def run():
+            state = {
+                "company_data": None, "market_data": None, "stock_data": None, "forecast_data": None,
+                "visualization_data": None, "report": None,
+                "run_config": {"watchlist": watchlist, "report_dir": os.path.join(case_root, "report")},
+            }
+            return graph.invoke(state)
+
+        for stage, repeats in (("graph_invoke_cold", 1), ("graph_invoke_warm", args.repeats)):
+            get_run_metrics().reset()
+            result = measure(stage, {"tickers": tickers}, run, repeats, warmup=0)
+            result["node_metrics"] = get_run_metrics().summary()  # 노드/기업별 시간·토큰 (반복 합계)
+            yield result
+
+
+BENCHMARKS = {
+    "prepare_data": bench_prepare_data,
+    "transformer_forecast": bench_transformer_forecast,
+    "global_forecast": bench_global_forecast,
+    "predict_future": bench_predict_future,
+    "retrieval": bench_retrieval,
+    "visualization": bench_visualization,
+    "report": bench_report,
+    "graph_invoke": bench_graph_invoke,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 파이프라인 벤치마크")
+    parser.add_argument("--tickers", type=parse_axis, default=[1, 3, 8], help="티커 수 축 (쉼표 구분)")
+    parser.add_argument("--history", type=parse_axis, default=[250, 1000, 2500], help="주가 이력 길이(영업일) 축")
+    parser.add_argument("--top-k", dest="top_k", type=parse_axis, default=[3, 5, 10], help="검색 top_k 축")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--epochs", type=int, default=2, help="transformer_forecast 단계의 학습 에폭 수")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="가짜 LLM 응답 지연(초)")
+    parser.add_argument("--stages", default=",".join(STAGES), help="실행할 단계 (쉼표 구분)")
+    parser.add_argument("--quick", action="store_true", help="작은 축과 1회 반복으로 빠르게 확인")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본값: benchmarks/results/<시각>-<커밋>.json)")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.tickers, args.history, args.top_k, args.repeats, args.epochs = [1, 3], [250], [5], 1, 1
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"알 수 없는 단계: {sorted(unknown)}")
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    np.random.seed(SEED)
+    torch.manual_seed(SEED)
+
+    # 오프라인 대체 입력 준비
+    use_fake_llm(latency=args.llm_latency)
+    use_synthetic_prices(os.path.join(BENCH_ROOT, "raw"))
+    fixture = build_chroma_fixture(os.path.join(BENCH_ROOT, "vectorstores"), company_names(max(args.tickers)))
+
+    results = []
+    try:
+        for stage in stages:
+            results.extend(BENCHMARKS[stage](args))
+    finally:
+        output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{git_commit()}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "commit": git_commit(),
+                    "timestamp": time.time(),
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "torch": torch.__version__,
+                    "numpy": np.__version__,
+                    "args": {k: v for k, v in vars(args).items()},
+                    "fixture": fixture,
+                },
+                "results": results,
+            }, f, ensure_ascii=False, indent=2, default=str)
+        print(f"결과 저장: {output}")
+        shutil.rmtree(BENCH_ROOT, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
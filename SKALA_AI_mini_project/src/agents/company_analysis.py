@@ -2,22 +2,22 @@ import logging
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
 from dotenv import load_dotenv
 import os
 
+from src.utils.concurrency import run_per_company
+from src.utils.context_builder import build_context
+from src.utils.llm_cache import cached_invoke
+from src.ingestion.company_tags import company_filter
+from src.utils.retrieval import batch_similarity_search, filtered_mmr_search
+from src.utils.instrumentation import track
+from src.utils.vectorstore_registry import get_vector_store
+
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-# ✅ 임베딩 모델 설정
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-
-# ✅ Chroma DB 로드 (기업별 자료 포함)
-vector_db = Chroma(
-    persist_directory="./vectorstores/company_db",  # DB 폴더명을 상황에 맞게 수정
-    embedding_function=embeddings
-)
+# ✅ 검색 방식 ("filtered": 기업 메타데이터 필터 + MMR, "semantic": 기업명 유사도 검색)
+COMPANY_RETRIEVAL_MODE = os.getenv("COMPANY_RETRIEVAL_MODE", "filtered")
 
 # ✅ 분석 프롬프트 템플릿
 company_prompt = PromptTemplate.from_template(
@@ -63,37 +63,93 @@ company_list = [
     "동원시스템즈",
 ]
 
+# ✅ 단일 기업 분석 함수
+def analyze_company(company: str, top_k: int = 5, results=None):
+    """
+    한 기업에 대해 문서를 검색하고 LLM 분석을 수행합니다.
+
+    Args:
+        company (str): 분석 대상 기업명
+        top_k (int): 유사도 검색에서 반환할 문서 수
+        results (list): 미리 검색된 문서 (주어지면 검색을 생략)
+
+    Returns:
+        str: LLM 분석 결과
+    """
+    logging.info(f"Analyzing: {company}")
+    if results is None:
+        # 유사도 기반 문서 검색 (임베딩 모델/Chroma DB는 최초 사용 시 로드)
+        vector_db = get_vector_store("company")
+        with track("retrieval", method="similarity", queries=1):
+            results = vector_db.similarity_search(company, k=top_k)
+    logging.info(f"Search Results for {company}: {[r.page_content for r in results]}")
+    # 중복 청크를 제거하고 토큰 예산 안에서 관련성 높은 순으로 컨텍스트 구성
+    content, results, _ = build_context(results)
+
+    # LLM에 입력 (동일 프롬프트/검색 결과면 캐시 사용)
+    analysis_result = cached_invoke(
+        company_analysis_chain, {"text": content, "company": company}, documents=results, label=company
+    )
+    logging.info(f"LLM Output for {company}: {analysis_result}")
+    return analysis_result
+
+# ✅ 기업별 문서 검색 함수
+def retrieve_company_documents(vector_db, top_k: int = 5, mode: str = None, companies=None):
+    """
+    기업별 검색 결과를 반환합니다. filtered 모드에서는 수집 시 태깅된 기업 메타데이터로 후보를 좁힌 뒤 MMR로
+    고르고, 태깅된 청크가 없는 기업(기존 DB 등)은 기업명 유사도 검색으로 대체합니다.
+
+    Args:
+        vector_db (Chroma): 기업 자료 벡터 DB
+        top_k (int): 기업별 반환할 문서 수
+        mode (str): "filtered" 또는 "semantic" (기본값: COMPANY_RETRIEVAL_MODE 환경 변수)
+        companies (list): 검색할 기업명 목록 (기본값: company_list)
+
+    Returns:
+        dict: 기업명 -> Document 리스트
+    """
+    mode = mode or COMPANY_RETRIEVAL_MODE
+    companies = list(companies or company_list)
+    results = {}
+    if mode == "filtered":
+        filters = {company: company_filter(company) for company in companies if company_filter(company)}
+        results = {company: docs for company, docs in filtered_mmr_search(vector_db, filters, k=top_k).items() if docs}
+
+    # 기업별 유사도 검색을 한 번의 임베딩 호출 + 한 번의 Chroma 질의로 처리
+    remaining = [company for company in companies if company not in results]
+    if remaining:
+        results.update(batch_similarity_search(vector_db, remaining, k=top_k))
+    return results
+
 # ✅ 기업 분석 실행 함수
-def run_company_analysis(state, top_k: int = 5):
+def run_company_analysis(state, top_k: int = 5, max_workers: int = None):
     """
     기업 분석 에이전트 함수. Supervisor에서 호출되며, state를 통해 데이터를 전달받고 결과를 저장합니다.
+    모든 기업의 검색 쿼리는 한 번에 임베딩/검색하고, 기업별 LLM 분석은 스레드 풀에서 동시에 실행되며,
+    실패한 기업은 {"error": ...}로 기록됩니다.
 
     Args:
-        state (dict): Supervisor에서 전달받은 상태 객체
+        state (dict): Supervisor에서 전달받은 상태 객체 (run_config.watchlist가 있으면 해당 기업을 분석)
         top_k (int): 유사도 검색에서 반환할 문서 수
+        max_workers (int): 최대 동시 실행 수 (기본값: AGENT_MAX_WORKERS 환경 변수, 1이면 순차 실행)
 
     Returns:
-        dict: 업데이트된 state 객체
+        dict: state 업데이트 (이 에이전트가 담당하는 키만 포함)
     """
-    result_dict = {}
-    for company in company_list:
-        try:
-            logging.info(f"Analyzing: {company}")
-            # 유사도 기반 문서 검색
-            results = vector_db.similarity_search(company, k=top_k)
-            logging.info(f"Search Results for {company}: {[r.page_content for r in results]}")
-            content = "\n\n".join([r.page_content for r in results])
-
-            # LLM에 입력
-            analysis_result = company_analysis_chain.invoke({"text": content, "company": company})
-            logging.info(f"LLM Output for {company}: {analysis_result}")
-
-            # 결과 저장
-            result_dict[company] = analysis_result
-        except Exception as e:
-            logging.error(f"Error analyzing {company}: {str(e)}")
-            result_dict[company] = {"error": str(e)}
-
-    # 결과를 state에 저장
-    state["company_data"] = result_dict
-    return state
\ No newline at end of file
+    companies = list((state.get("run_config") or {}).get("watchlist") or company_list)
+    try:
+        search_results = retrieve_company_documents(get_vector_store("company"), top_k, companies=companies)
+    except Exception as e:
+        # 일괄 검색이 실패하면 기업별 개별 검색으로 대체 (기업 단위 오류 격리 유지)
+        logging.error(f"Batch retrieval failed, falling back to per-company search: {str(e)}")
+        search_results = {}
+
+    result_dict = run_per_company(
+        lambda company, _: analyze_company(company, top_k=top_k, results=search_results.get(company)),
+        companies,
+        max_workers=max_workers,
+        step="analyze",
+    )
+
+    # 결과를 state 업데이트로 반환 (병렬 노드와 충돌하지 않도록 자신의 키만 반환)
+    return {"company_data": result_dict}
@@ -1,68 +1,191 @@
 import os
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from matplotlib import rc
-from typing import Dict, List
 import logging
-import json
+import hashlib
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 
-# 한글 폰트 설정
-rc('font', family='Malgun Gothic')  # Windows 환경에서 '맑은 고딕' 사용
-plt.rcParams['axes.unicode_minus'] = False  # 마이너스 기호 깨짐 방지
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.ticker import StrMethodFormatter
+from matplotlib import font_manager
+
+# ✅ 렌더링 설정
+VIZ_OUTPUT_DIR = os.getenv("VIZ_OUTPUT_DIR", os.path.join(os.path.dirname(__file__), "../../output"))  # 차트 저장 위치
+VIZ_PROCESSES = int(os.getenv("VIZ_PROCESSES", "0"))  # 0이면 자동, 1이면 현재 프로세스에서 렌더링
+PROCESS_POOL_MIN_CHARTS = 4  # 이보다 적으면 프로세스 생성 비용이 더 크므로 직접 렌더링
+VIZ_FONT_PATH = os.getenv("VIZ_FONT_PATH")  # 한글 글리프가 있는 폰트 파일(.ttf/.otf) 경로 (설치된 폰트보다 우선)
+
+# 한글 폰트 후보 (Windows → macOS → Linux 순). Noto CJK는 설치 방식에 따라 JP/SC 이름으로 등록되지만 한글을 포함
+KOREAN_FONT_CANDIDATES = ["Malgun Gothic", "AppleGothic", "NanumGothic", "Noto Sans CJK KR", "Noto Sans KR",
+                          "Noto Sans CJK JP", "Noto Sans CJK SC"]
+
+# seaborn "whitegrid"에 해당하는 스타일. 동시에 렌더링하는 스레드끼리 충돌하지 않도록 전역 rcParams(rc_context)
+# 대신 차트마다 Axes 인자로 적용
+GRID_COLOR = ".8"
+
+
+@lru_cache(maxsize=1)
+def resolve_font() -> font_manager.FontProperties:
+    """
+    한글 폰트를 찾아 FontProperties로 반환합니다. VIZ_FONT_PATH가 있으면 그 폰트 파일을, 없으면 설치된 폰트에서
+    찾습니다. 최초 렌더링 시 한 번만 조회하며, 없으면 기본 폰트를 사용합니다.
+    """
+    if VIZ_FONT_PATH:
+        try:
+            font_manager.get_font(VIZ_FONT_PATH)  # 읽을 수 없는 파일이면 여기서 실패
+            return font_manager.FontProperties(fname=VIZ_FONT_PATH)
+        except Exception as e:
+            logging.warning(f"VIZ_FONT_PATH 폰트를 불러오지 못했습니다 ({VIZ_FONT_PATH}): {str(e)}")
+
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    for family in KOREAN_FONT_CANDIDATES:
+        if family in installed:
+            return font_manager.FontProperties(family=family)
+    # DejaVu Sans에는 한글 글리프가 없어 기업명/제목의 한글이 빈 상자로 그려짐
+    logging.warning(
+        "한글 폰트를 찾지 못해 기본 폰트(DejaVu Sans)를 사용합니다. 차트의 한글은 빈 상자로 표시됩니다. "
+        "나눔고딕/Noto Sans CJK 폰트를 설치하거나(예: apt install fonts-nanum) VIZ_FONT_PATH에 폰트 파일 경로를 "
+        "지정하세요."
+    )
+    return font_manager.FontProperties(family="DejaVu Sans")
+
+
+def forecast_key(forecast) -> str:
+    """
+    예측 날짜/값으로 계산한 해시. 차트 PNG 메타데이터에 기록해 같은 예측이면 다시 그리지 않습니다.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(forecast["dates"]).tobytes())
+    digest.update(np.ascontiguousarray(forecast["values"], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def render_forecast_chart(company: str, forecast, image_path: str, key: str = None) -> str:
+    """
+    pyplot 전역 상태와 rcParams를 건드리지 않고 Figure 객체로 예측 차트를 그려 저장합니다. 폰트와 스타일은 이
+    차트의 텍스트/Axes에만 적용되므로 여러 스레드에서 동시에 호출할 수 있고, 프로세스 풀에서 호출할 수 있도록
+    모듈 최상위 함수로 둡니다.
+
+    Args:
+        company (str): 기업명
+        forecast (dict): {"dates": datetime64 배열, "values": float64 배열}
+        image_path (str): 저장할 이미지 경로
+        key (str): PNG 메타데이터에 기록할 예측 해시
+    """
+    font = resolve_font()
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot(facecolor="white")
+    for spine in ax.spines.values():
+        spine.set_edgecolor(GRID_COLOR)
+    ax.grid(True, color=GRID_COLOR)
+    ax.plot(forecast["dates"], forecast["values"], label="Forecast")
+    # 한글이 들어가는 텍스트에 폰트 지정 (눈금은 숫자/날짜만 표시)
+    ax.set_title(f"{company} stock price forecast", fontproperties=font)
+    ax.set_xlabel("date", fontproperties=font)
+    ax.set_ylabel("price", fontproperties=font)
+    ax.legend(prop=font)
+    # 가격 눈금은 ASCII 숫자로 표시 (유니코드 마이너스 기호가 한글 폰트에서 깨지는 문제 방지)
+    ax.yaxis.set_major_formatter(StrMethodFormatter("{x:,.0f}"))
+    fig.autofmt_xdate()
+    fig.savefig(image_path, metadata={"Description": key} if key else None)
+    return image_path
+
+
+def is_up_to_date(image_path: str, key: str) -> bool:
+    """
+    이미지 메타데이터의 예측 해시가 현재 예측과 같으면 다시 그릴 필요가 없습니다.
+    """
+    if not os.path.exists(image_path):
+        return False
+    try:
+        from PIL import Image
+
+        with Image.open(image_path) as image:
+            return image.text.get("Description") == key
+    except Exception:
+        return False
+
+
+def render_charts(jobs: dict, max_workers: int = None) -> dict:
+    """
+    여러 차트를 렌더링합니다. 차트가 많으면 프로세스 풀에서 코어 수만큼 병렬로 그립니다.
+
+    Args:
+        jobs (dict): 기업명 -> (예측 {"dates", "values"}, 이미지 경로, 예측 해시)
+        max_workers (int): 최대 프로세스 수 (기본값: VIZ_PROCESSES 환경 변수, 0이면 CPU 코어 수)
+
+    Returns:
+        dict: 기업명 -> {"image_path": ...} 또는 {"error": ...}
+    """
+    workers = max_workers if max_workers is not None else VIZ_PROCESSES
+    workers = max(1, min(workers or (os.cpu_count() or 1), len(jobs) or 1))
+    if max_workers is None and not VIZ_PROCESSES and len(jobs) < PROCESS_POOL_MIN_CHARTS:
+        workers = 1
+
+    results = {}
+    if workers == 1:
+        for company, job in jobs.items():
+            try:
+                results[company] = {"image_path": render_forecast_chart(company, *job)}
+            except Exception as e:
+                logging.error(f"Error visualizing {company}: {str(e)}")
+                results[company] = {"error": str(e)}
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {
+            company: executor.submit(render_forecast_chart, company, *job)
+            for company, job in jobs.items()
+        }
+        for company, future in futures.items():
+            try:
+                results[company] = {"image_path": future.result()}
+            except Exception as e:
+                logging.error(f"Error visualizing {company}: {str(e)}")
+                results[company] = {"error": str(e)}
+    return results
 
-sns.set(style="whitegrid")
 
 def visualize_forecast_separately(state):
     """
-    시각화 에이전트 함수. ./output 디렉토리에서 예측 데이터를 읽어와 이미지를 생성합니다.
+    시각화 에이전트 함수. 주가 예측 에이전트가 state에 담은 forecast_data로 바로 이미지를 생성합니다.
+    같은 예측으로 이미 그린 이미지(PNG 메타데이터의 해시가 같은 경우)는 다시 그리지 않습니다.
 
     Args:
         state (dict): Supervisor에서 전달받은 상태 객체
 
     Returns:
-        dict: 업데이트된 state 객체
+        dict: state 업데이트 (이 에이전트가 담당하는 키만 포함)
     """
-    # 프로젝트 루트 디렉토리의 output 폴더를 참조
-    output_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../output"))
-    
+    # run_config.output_dir(API 작업별 디렉토리 등)이 없으면 프로젝트 루트의 output 폴더(VIZ_OUTPUT_DIR)에 이미지를 저장
+    output_dir = os.path.abspath((state.get("run_config") or {}).get("output_dir") or VIZ_OUTPUT_DIR)
+
     # output 디렉토리가 없으면 생성
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         logging.info(f"Output directory created at {output_dir}")
 
     visualization_data = {}
+    jobs = {}
 
-    # ./output 디렉토리에서 JSON 파일 읽기
-    for file_name in os.listdir(output_dir):
-        if file_name.endswith("_forecast.json"):  # JSON 파일만 처리
-            company = file_name.replace("_forecast.json", "")  # 회사 이름 추출
-            file_path = os.path.join(output_dir, file_name)
+    for company, forecast in (state.get("forecast_data") or {}).items():
+        image_path = os.path.join(output_dir, f"{company}_forecast.png")
+        key = forecast_key(forecast)
 
-            try:
-                # JSON 파일 읽기
-                with open(file_path, "r", encoding="utf-8") as f:
-                    forecast = json.load(f)
-
-                # 시각화 생성
-                plt.figure(figsize=(10, 6))
-                plt.plot(forecast, label="Forecast")
-                plt.title(f"{company} stock price forecast")
-                plt.xlabel("date")
-                plt.ylabel("price")
-                plt.legend()
-
-                # 이미지 저장
-                image_path = os.path.join(output_dir, f"{company}_forecast.png")
-                plt.savefig(image_path)
-                plt.close()
-                logging.info(f"Visualization saved for {company} at {image_path}")
-
-                visualization_data[company] = {"image_path": image_path}
-            except Exception as e:
-                logging.error(f"Error visualizing {company}: {str(e)}")
-                visualization_data[company] = {"error": str(e)}
+        if is_up_to_date(image_path, key):
+            logging.info(f"Visualization up to date for {company}: {image_path}")
+            visualization_data[company] = {"image_path": image_path}
+            continue
+        jobs[company] = (forecast, image_path, key)
+
+    # 시각화 생성
+    for company, result in render_charts(jobs).items():
+        if "image_path" in result:
+            logging.info(f"Visualization saved for {company} at {result['image_path']}")
+        visualization_data[company] = result
 
-    # 결과를 state에 저장
-    state["visualization_data"] = visualization_data
-    return state
\ No newline at end of file
+    # 결과를 state 업데이트로 반환
+    return {"visualization_data": visualization_data}
@@ -3,24 +3,18 @@ from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
 from dotenv import load_dotenv  
 import os  
 
+from src.utils.llm_cache import cached_invoke
+from src.utils.context_builder import build_context
+from src.utils.vectorstore_registry import get_vector_store
+from src.utils.instrumentation import track
+
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 
-# ✅ 임베딩 모델 설정
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-
-# ✅ Chroma 벡터 DB 로드
-vector_db = Chroma(
-    persist_directory="./vectorstores/battery_db",  # 배터리 산업 관련 DB 경로로 수정하세요
-    embedding_function=embeddings
-)
-
 # ✅ 배터리 산업 분석 프롬프트 정의
 battery_prompt = PromptTemplate.from_template(
     """
@@ -64,33 +58,38 @@ def run_battery_market_agent(state, keyword: str = "배터리 산업", top_k: in
     시장 분석 에이전트 함수. Supervisor에서 호출되며, state를 통해 데이터를 전달받고 결과를 저장합니다.
 
     Args:
-        state (dict): Supervisor에서 전달받은 상태 객체
+        state (dict): Supervisor에서 전달받은 상태 객체 (run_config.keyword가 있으면 검색 키워드로 사용)
         keyword (str): 검색 키워드
         top_k (int): 유사도 검색에서 반환할 문서 수
 
     Returns:
-        dict: 업데이트된 state 객체
+        dict: state 업데이트 (이 에이전트가 담당하는 키만 포함)
     """
+    keyword = (state.get("run_config") or {}).get("keyword") or keyword
     try:
         logging.info(f"Running battery market agent with keyword: {keyword}")
 
-        # Chroma에서 유사도 기반 검색
-        results = vector_db.similarity_search(keyword, k=top_k)
-        content = "\n\n".join([r.page_content for r in results])
+        # Chroma에서 유사도 기반 검색 (임베딩 모델/Chroma DB는 최초 사용 시 로드)
+        vector_db = get_vector_store("battery")
+        with track("retrieval", method="similarity", queries=1):
+            scored = vector_db.similarity_search_with_score(keyword, k=top_k)
+
+        # 중복 청크를 제거하고 토큰 예산 안에서 관련성 높은 순으로 컨텍스트 구성 (점수는 거리이므로 부호 반전)
+        content, results, _ = build_context([doc for doc, _ in scored], scores=[-distance for _, distance in scored])
 
-        # LLM에 전달
-        result = battery_analysis_chain.invoke({"text": content})
+        # LLM에 전달 (동일 프롬프트/검색 결과면 캐시 사용)
+        result = cached_invoke(battery_analysis_chain, {"text": content}, documents=results, label=keyword)
 
         logging.info("Battery Market Agent completed successfully.")
-        # 결과를 state에 저장
-        state["market_data"] = {
+        # 결과를 state 업데이트로 반환
+        market_data = {
             "keyword": keyword,
             "분석 결과": result
         }
     except Exception as e:
         logging.error(f"Battery Market Agent Error: {str(e)}")
-        state["market_data"] = {
+        market_data = {
             "error": str(e)
         }
 
-    return state
\ No newline at end of file
+    return {"market_data": market_data}
@@ -1,14 +1,61 @@
 import os
-import markdown2  # Markdown 변환 라이브러리
-from weasyprint import HTML  # HTML을 PDF로 변환
+import base64
 import logging
-from PyPDF2 import PdfMerger
-from PIL import Image
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import markdown2  # Markdown 변환 라이브러리
 
 # 출력 디렉토리 설정
 OUTPUT_DIR = "results/final_reports"
+SECTIONS_DIRNAME = "sections"  # 보고서 디렉토리 아래 섹션 Markdown 저장 위치
+REPORT_NAME = "Battery_Industry_Report"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# 보고서 스타일 (HTML 파일에는 <style>로 넣고, PDF 렌더링에는 한 번 컴파일한 스타일시트를 재사용)
+REPORT_CSS = """
+body {
+    font-family: Arial, sans-serif;
+    line-height: 1.6;
+    margin: 20px;
+    text-align: justify; /* 문단 양쪽 정렬 */
+}
+h1, h2, h3 {
+    color: #2c3e50;
+}
+h1 {
+    border-bottom: 2px solid #2c3e50;
+    padding-bottom: 10px;
+}
+h2 {
+    text-align: center; /* 제목 가운데 정렬 */
+}
+ul {
+    margin: 10px 0;
+    padding-left: 20px;
+}
+li {
+    margin-bottom: 5px;
+}
+img {
+    max-width: 100%;
+    height: auto;
+}
+"""
+
+# HTML/Markdown/PDF를 동시에 렌더링하는 스레드 풀 (보고서 작업 간 공유)
+_render_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="report-render")
+# WeasyPrint의 FontConfiguration은 스레드 안전이 보장되지 않으므로 렌더링 스레드마다 따로 만들어 재사용
+_pdf_local = threading.local()
+
+# 스트리밍 실행 시 노드가 끝나는 즉시 저장할 보고서 섹션 (state 키 -> 제목)
+SECTION_TITLES = {
+    "company_data": "2. 기업 분석 결과",
+    "market_data": "3. 시장 분석 결과",
+    "stock_data": "4. 주가 예측 결과",
+    "visualization_data": "5. 주가 예측 그래프",
+}
+
 def generate_report(state):
     """
     보고서를 생성하는 함수. state 객체를 기반으로 Markdown 및 PDF 보고서를 생성합니다.
@@ -17,14 +64,53 @@ def generate_report(state):
         state (dict): Supervisor에서 전달받은 상태 객체
 
     Returns:
-        dict: 업데이트된 state 객체
+        dict: state 업데이트 (이 에이전트가 담당하는 키만 포함)
     """
+    # 작업별 출력 디렉토리 (API 작업 등에서 run_config.report_dir로 지정)
+    output_dir = (state.get("run_config") or {}).get("report_dir") or OUTPUT_DIR
     try:
+        os.makedirs(output_dir, exist_ok=True)
+
         # 서론 생성
         intro_text = generate_intro(state)
 
-        # Markdown 형식으로 보고서 내용 생성
-        markdown_text = f"""
+        # Markdown 파일/요약에는 이미지 경로를, HTML/PDF에는 data URI로 인라인한 이미지를 사용
+        visualization_data = state.get('visualization_data', '결과 없음')
+        markdown_text = build_markdown(state, intro_text, format_visualization(visualization_data, relative_to=output_dir))
+        html_body = markdown2.markdown(build_markdown(state, intro_text, format_visualization(visualization_data, inline=True)))
+
+        output_md_path = os.path.join(output_dir, f"{REPORT_NAME}.md")
+        output_html_path = os.path.join(output_dir, f"{REPORT_NAME}.html")
+        output_pdf_path = os.path.join(output_dir, f"{REPORT_NAME}.pdf")
+
+        # 세 가지 형식을 동시에 렌더링 (임시 파일 없이 각 결과 파일에 한 번에 기록)
+        futures = [
+            _render_executor.submit(write_text, output_md_path, markdown_text),
+            _render_executor.submit(write_text, output_html_path, wrap_html(html_body)),
+            _render_executor.submit(save_html_to_pdf, wrap_html(html_body, inline_style=False), output_pdf_path),
+        ]
+        for future in futures:
+            future.result()
+        logging.info(f"Markdown/HTML/PDF 보고서가 저장되었습니다: {output_md_path}, {output_html_path}, {output_pdf_path}")
+
+        # 결과를 state 업데이트로 반환
+        report = {
+            "file_path": output_pdf_path,
+            "html_path": output_html_path,
+            "markdown_path": output_md_path,
+            "summary": markdown_text
+        }
+    except Exception as e:
+        logging.error(f"레포트 생성 중 오류가 발생했습니다: {str(e)}")
+        report = {"error": str(e)}
+
+    return {"report": report}
+
+def build_markdown(state, intro_text, visualization_text):
+    """
+    state로 보고서 Markdown 본문을 만듭니다.
+    """
+    return f"""
 ##배터리 시장 트랜드 분석 보고서
 
 ### 1. 서론
@@ -38,35 +124,16 @@ def generate_report(state):
 
 ### 4. 주가 예측 결과
 {format_section(state.get('stock_data', '결과 없음'))}
+{format_forecast(state.get('forecast_data'))}
 
 ### 5. 주가 예측 그래프
-{format_visualization(state.get('visualization_data', '결과 없음'))}
+{visualization_text}
         """
 
-        # Markdown을 HTML로 변환
-        html_content = markdown_to_html(markdown_text)
-
-        # HTML 파일 저장 (디버깅용)
-        output_html_path = os.path.join(OUTPUT_DIR, "Battery_Industry_Report.html")
-        with open(output_html_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        logging.info(f"HTML 보고서가 저장되었습니다: {output_html_path}")
-
-        # PDF 저장
-        output_pdf_path = os.path.join(OUTPUT_DIR, "Battery_Industry_Report.pdf")
-        save_html_to_pdf(html_content, output_pdf_path)
-        logging.info(f"PDF 보고서가 저장되었습니다: {output_pdf_path}")
-
-        # 결과를 state에 저장
-        state["report"] = {
-            "file_path": output_pdf_path,
-            "summary": markdown_text
-        }
-    except Exception as e:
-        logging.error(f"레포트 생성 중 오류가 발생했습니다: {str(e)}")
-        state["report"] = {"error": str(e)}
-
-    return state
+def write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
 
 def generate_intro(state):
     """
@@ -106,105 +173,134 @@ def format_section(data):
     else:
         return str(data)
 
-def format_visualization(data):
+def format_forecast(data):
+    """
+    state의 예측 배열을 기업별 기간/변화율 요약 Markdown으로 변환합니다.
+    """
+    if not data:
+        return ""
+    lines = []
+    for company, forecast in data.items():
+        dates, values = forecast["dates"], forecast["values"]
+        if len(values) == 0:
+            continue
+        change = (values[-1] / values[0] - 1) * 100 if values[0] else 0.0
+        lines.append(
+            f"- **{company}** 예측 ({dates[0]} ~ {dates[-1]}): "
+            f"{values[0]:,.0f} → {values[-1]:,.0f} ({change:+.1f}%), 최저 {values.min():,.0f} / 최고 {values.max():,.0f}"
+        )
+    return "\n".join(lines)
+
+@lru_cache(maxsize=64)
+def _image_data_uri(image_path, mtime):
+    with open(image_path, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode("ascii")
+    return f"data:image/png;base64,{encoded}"
+
+def image_data_uri(image_path):
+    """
+    이미지를 data URI로 변환합니다. 같은 이미지(경로+수정 시각)는 메모리에서 재사용합니다.
+    """
+    return _image_data_uri(os.path.abspath(image_path), os.path.getmtime(image_path))
+
+def format_visualization(data, inline=False, relative_to=None):
     """
     시각화 데이터를 사람이 읽기 쉬운 Markdown 형식으로 변환합니다.
+
+    Args:
+        data (dict): 기업명 -> {"image_path": ...}
+        inline (bool): True면 이미지를 data URI로 본문에 포함 (HTML/PDF용)
+        relative_to (str): 이미지 경로를 이 디렉토리 기준 상대 경로로 표시 (Markdown 파일용)
     """
     if isinstance(data, dict):
         visualization_lines = []
         for key, value in data.items():
-            # 이미지 경로를 절대 경로로 변환
-            image_path = os.path.abspath(value.get("image_path", "이미지 경로 없음"))
-            visualization_lines.append(f"- **{key}**: ![이미지]({image_path})")
+            image_path = value.get("image_path")
+            if not image_path or not os.path.exists(image_path):
+                visualization_lines.append(f"- **{key}**: 이미지 없음 ({value.get('error', '이미지 경로 없음')})")
+                continue
+            if inline:
+                src = image_data_uri(image_path)
+            elif relative_to:
+                src = os.path.relpath(image_path, relative_to).replace(os.sep, "/")
+            else:
+                src = image_path
+            visualization_lines.append(f"- **{key}**: ![이미지]({src})")
         return "\n".join(visualization_lines)
     else:
         return "시각화 데이터 없음"
 
-def markdown_to_html(markdown_text):
+def write_section(key, data, report_dir=None):
     """
-    Markdown 텍스트를 HTML로 변환하는 함수.
+    완료된 보고서 섹션을 Markdown 파일로 바로 저장합니다. 최종 보고서보다 먼저 결과를 확인할 수 있도록
+    스트리밍 실행에서 노드가 끝날 때마다 호출합니다.
+
+    Args:
+        key (str): state 키 (SECTION_TITLES 참고)
+        data: 해당 state 값
+        report_dir (str): 실행의 보고서 디렉토리 (run_config.report_dir, 기본값: OUTPUT_DIR). 섹션은 그 아래
+            sections/에 저장되므로 동시에 실행되는 그래프끼리 덮어쓰지 않습니다.
+
+    Returns:
+        str: 저장된 파일 경로 (보고서 섹션이 아니면 None)
+    """
+    title = SECTION_TITLES.get(key)
+    if title is None or data is None:
+        return None
+    body = format_visualization(data) if key == "visualization_data" else format_section(data)
+    sections_dir = os.path.join(report_dir or OUTPUT_DIR, SECTIONS_DIRNAME)
+    os.makedirs(sections_dir, exist_ok=True)
+    section_path = os.path.join(sections_dir, f"{key}.md")
+    with open(section_path, "w", encoding="utf-8") as f:
+        f.write(f"### {title}\n{body}\n")
+    return section_path
+
+def wrap_html(html_body, inline_style=True):
+    """
+    HTML 본문을 보고서 문서로 감쌉니다. PDF 렌더링에는 컴파일된 스타일시트를 따로 넘기므로 inline_style=False를 사용합니다.
     """
-    html_body = markdown2.markdown(markdown_text)
-    html_template = f"""
+    style = f"<style>{REPORT_CSS}</style>" if inline_style else ""
+    return f"""
     <!DOCTYPE html>
     <html lang="ko">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>배터리 시장 트렌드 분석 보고서</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                line-height: 1.6;
-                margin: 20px;
-                text-align: justify; /* 문단 양쪽 정렬 */
-            }}
-            h1, h2, h3 {{
-                color: #2c3e50;
-            }}
-            h1 {{
-                border-bottom: 2px solid #2c3e50;
-                padding-bottom: 10px;
-            }}
-            h2 {{
-                text-align: center; /* 제목 가운데 정렬 */
-            }}
-            ul {{
-                margin: 10px 0;
-                padding-left: 20px;
-            }}
-            li {{
-                margin-bottom: 5px;
-            }}
-            img {{
-                max-width: 100%;
-                height: auto;
-            }}
-        </style>
+        {style}
     </head>
     <body>
         {html_body}
     </body>
     </html>
     """
-    return html_template
 
 
-def save_html_to_pdf(html_content, output_pdf_path, visualization_images=None):
+def get_pdf_stylesheet():
+    """
+    컴파일된 보고서 CSS와 폰트 설정을 반환합니다. 현재 스레드에서 처음 호출할 때 만들고, 같은 스레드의 이후
+    보고서에서 재사용합니다. (여러 스레드가 하나의 FontConfiguration을 동시에 쓰지 않음)
+    """
+    if not hasattr(_pdf_local, "stylesheet"):
+        from weasyprint import CSS  # HTML을 PDF로 변환 (무거운 모듈이므로 처음 PDF를 만들 때 로드)
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        _pdf_local.stylesheet = (CSS(string=REPORT_CSS, font_config=font_config), font_config)
+    return _pdf_local.stylesheet
+
+
+def save_html_to_pdf(html_content, output_pdf_path):
     """
-    HTML 콘텐츠를 PDF로 저장하고, 그래프 이미지를 PDF의 마지막에 추가하는 함수.
+    HTML 콘텐츠를 한 번의 렌더링으로 PDF에 저장하는 함수. 그래프는 data URI로 HTML에 포함되어 있으므로
+    임시 PDF 생성/병합 없이 바로 최종 파일을 씁니다.
 
     Args:
-        html_content (str): HTML 콘텐츠.
+        html_content (str): HTML 콘텐츠 (이미지는 data URI로 인라인).
         output_pdf_path (str): 최종 PDF 파일 경로.
-        visualization_images (list): 추가할 그래프 이미지 경로 리스트.
-    """
-    # 1. HTML을 PDF로 변환
-    temp_pdf_path = output_pdf_path.replace(".pdf", "_temp.pdf")
-    HTML(string=html_content).write_pdf(temp_pdf_path)
-
-    # 2. 그래프 이미지를 PDF로 변환
-    image_pdfs = []
-    if visualization_images:
-        for image_path in visualization_images:
-            try:
-                # 이미지 파일을 PDF로 변환
-                image = Image.open(image_path)
-                image_pdf_path = image_path.replace(".png", ".pdf").replace(".jpg", ".pdf")
-                image.convert("RGB").save(image_pdf_path)
-                image_pdfs.append(image_pdf_path)
-            except Exception as e:
-                logging.error(f"이미지 변환 중 오류 발생: {image_path}, {str(e)}")
-
-    # 3. PDF 병합
-    merger = PdfMerger()
-    merger.append(temp_pdf_path)  # HTML로 생성된 PDF 추가
-    for image_pdf in image_pdfs:
-        merger.append(image_pdf)  # 이미지 PDF 추가
-    merger.write(output_pdf_path)
-    merger.close()
-
-    # 4. 임시 파일 삭제
-    os.remove(temp_pdf_path)
-    for image_pdf in image_pdfs:
-        os.remove(image_pdf)
\ No newline at end of file
+    """
+    from weasyprint import HTML
+
+    stylesheet, font_config = get_pdf_stylesheet()
+    HTML(string=html_content).write_pdf(output_pdf_path, stylesheets=[stylesheet], font_config=font_config)
+    return output_pdf_path
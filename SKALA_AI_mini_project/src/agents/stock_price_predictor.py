@@ -5,14 +5,17 @@ from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 import pandas as pd
+import numpy as np
 import json
-
-# 로깅 설정
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+from concurrent.futures import ThreadPoolExecutor
 
 # 외부 함수 임포트
 from src.fetcher.stock_data_fetcher import fetch_stock_data
-from src.models.stock_predictor_model import transformer_forecast
+from src.models.training_pool import forecast_in_process_pool
+from src.models.stock_predictor_model import global_forecast
+from src.utils.concurrency import run_per_company
+from src.utils.llm_cache import cached_invoke
+from src.utils.instrumentation import record
 
 # 환경 변수 로드
 load_dotenv()
@@ -44,66 +47,151 @@ llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1, openai_api_key=OPENAI_API
 output_parser = StrOutputParser()
 stock_chain = stock_prompt | llm | output_parser
 
+# ✅ 배터리 3사 목록 (기업명 -> 티커)
+DEFAULT_WATCHLIST = {
+    "Samsung SDI": "006400.KS",
+    "LG에너지솔루션": "373220.KS",
+    "동원시스템즈": "014820.KS"
+}
+
+# ✅ 예측 방식: "per_ticker"(티커별 모델, 프로세스 풀) 또는 "global"(watchlist 전체를 하나의 모델로 학습)
+FORECAST_MODE = os.getenv("FORECAST_MODE", "per_ticker")
+
+# ✅ 예측 결과 디스크 내보내기 (선택, 백그라운드 스레드에서 수행)
+FORECAST_EXPORT = os.getenv("FORECAST_EXPORT", "1") == "1"
+_export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forecast-export")
+
+def export_forecast(company: str, dates, values, output_dir: str = "output"):
+    """
+    예측 결과를 output/<company>_forecast.json, .csv로 저장합니다.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    # JSON 파일로 저장
+    json_path = os.path.join(output_dir, f"{company}_forecast.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(values.tolist(), f, ensure_ascii=False, indent=4)
+    logging.info(f"Forecast JSON saved for {company} at {json_path}")
+
+    # CSV 파일로 저장
+    csv_path = os.path.join(output_dir, f"{company}_forecast.csv")
+    pd.DataFrame({"Date": dates, "Forecast": values}).to_csv(csv_path, index=False)
+    logging.info(f"Forecast CSV saved for {company} at {csv_path}")
+
+def forecast_dates(last_date, horizon: int):
+    """
+    마지막 거래일 이후 horizon 영업일의 날짜 배열을 반환합니다.
+    """
+    start = pd.Timestamp(last_date) + pd.offsets.BDay(1)
+    return pd.bdate_range(start, periods=horizon).values.astype("datetime64[D]")
+
+# ✅ LLM 분석 함수
+def summarize_forecast(company: str, forecast, train_metrics: dict):
+    """
+    한 기업의 예측 결과에 대해 LLM 분석을 수행합니다.
+
+    Args:
+        company (str): 기업명
+        forecast (np.ndarray): 예측된 주가 배열
+        train_metrics (dict): transformer_forecast가 반환한 학습 지표
+
+    Returns:
+        str: LLM 분석 결과
+    """
+    logging.info(
+        f"Training finished for {company} ({train_metrics['mode']}): "
+        f"{len(train_metrics['epochs'])} epochs, {train_metrics['total_seconds']:.2f}s"
+    )
+
+    # LLM 호출 (동일한 예측값이면 캐시 사용)
+    analysis_result = cached_invoke(stock_chain, {
+        "company": company,
+        "text": json.dumps(forecast.tolist(), ensure_ascii=False)
+    }, label=company)
+
+    logging.info(f"LLM analysis result for {company}: {analysis_result}")
+    return analysis_result
+
 # ✅ 주가 예측 에이전트 함수
-def predict_stock_prices(state):
+def predict_stock_prices(state, max_workers: int = None, max_processes: int = None):
     """
     주가 예측 에이전트 함수. Supervisor에서 호출되며, 배터리 3사의 데이터를 직접 처리합니다.
+    데이터 수집과 LLM 분석은 스레드 풀에서, 티커별 모델 학습/예측은 프로세스 풀에서 동시에 실행되며,
+    실패한 기업은 {"error": ...}로 기록됩니다. 예측값은 forecast_data로 state에 담기고, 파일 저장(FORECAST_EXPORT)은
+    LLM 분석과 동시에 백그라운드에서 수행한 뒤 노드가 끝나기 전에 완료를 기다립니다. (저장 실패는 오류 로그로 남김)
 
     Args:
-        state (dict): Supervisor에서 전달받은 상태 객체
+        state (dict): Supervisor에서 전달받은 상태 객체 (run_config.watchlist가 있으면 해당 기업을 처리)
+        max_workers (int): 수집/LLM 최대 동시 실행 수 (기본값: AGENT_MAX_WORKERS 환경 변수, 1이면 순차 실행)
+        max_processes (int): 학습 프로세스 수 (기본값: TRAINING_PROCESSES 환경 변수, 1이면 현재 프로세스에서 실행)
 
     Returns:
-        dict: 업데이트된 state 객체
+        dict: state 업데이트 (이 에이전트가 담당하는 키만 포함)
     """
-    # 배터리 3사 목록 직접 정의
-    company_list = {
-        "Samsung SDI": "006400.KS",
-        "LG에너지솔루션": "373220.KS",
-        "동원시스템즈": "014820.KS"
-    }
+    # 분석 대상 목록 (run_config.watchlist가 없으면 배터리 3사)
+    run_config = state.get("run_config") or {}
+    company_list = run_config.get("watchlist") or DEFAULT_WATCHLIST
+    export_dir = run_config.get("output_dir") or "output"
 
     logging.info(f"Processing stock data for companies: {company_list}")
 
-    result_dict = {}
-    for company, ticker in company_list.items():
+    # 1. 주가 데이터 수집
+    frames = run_per_company(
+        lambda company, ticker: fetch_stock_data(company_name=company, ticker=ticker),
+        company_list,
+        max_workers=max_workers,
+        step="fetch",
+    )
+
+    # 2. 모델 학습 및 예측
+    jobs = {
+        company: (company_list[company], df)
+        for company, df in frames.items()
+        if isinstance(df, pd.DataFrame)
+    }
+    if FORECAST_MODE == "global":
+        # watchlist 전체를 하나의 패널로 묶어 한 번 학습하고 한 번의 배치로 예측
+        forecasts = global_forecast({company: df for company, (_, df) in jobs.items()})
+    else:
+        # 티커별 모델 (같은 티커의 체크포인트가 있으면 재사용하거나 새 날짜만 이어서 학습)
+        forecasts = forecast_in_process_pool(jobs, max_workers=max_processes)
+
+    # 학습 지표 기록 (글로벌 모델은 모든 기업이 하나의 지표를 공유하므로 한 번만 기록)
+    trained = {company: outcome[1] for company, outcome in forecasts.items() if not isinstance(outcome, dict)}
+    if FORECAST_MODE == "global":
+        trained = {None: metrics for metrics in list(trained.values())[:1]}
+    for company, metrics in trained.items():
+        record("training", company=company, mode=metrics["mode"], epochs=len(metrics["epochs"]),
+               seconds=metrics["total_seconds"],
+               epochs_per_sec=len(metrics["epochs"]) / metrics["total_seconds"] if metrics["total_seconds"] else None)
+
+    # 예측 결과는 날짜와 함께 NumPy 배열로 state에 담아 시각화/보고서 노드에 직접 전달
+    forecast_data, exports = {}, {}
+    for company, outcome in forecasts.items():
+        if isinstance(outcome, dict):
+            continue
+        values = np.asarray(outcome[0], dtype=np.float64)
+        dates = forecast_dates(frames[company].index[-1], len(values))
+        forecast_data[company] = {"dates": dates, "values": values}
+        if FORECAST_EXPORT:
+            exports[company] = _export_executor.submit(export_forecast, company, dates, values, export_dir)
+
+    # 3. LLM 분석
+    def _summarize(company, _):
+        outcome = forecasts.get(company, frames[company])
+        if isinstance(outcome, dict):  # 수집 또는 학습 단계의 오류
+            return outcome
+        return summarize_forecast(company, *outcome)
+
+    result_dict = run_per_company(_summarize, company_list, max_workers=max_workers, step="summarize")
+
+    # 예측 파일 저장 완료 대기 (실패해도 노드 결과에는 영향 없음)
+    for company, future in exports.items():
         try:
-            logging.info(f"Fetching stock data for {company} ({ticker})...")
-            # 주가 데이터 수집
-            stock_data = fetch_stock_data(company_name=company, ticker=ticker)
-
-            logging.info(f"Stock data fetched for {company}. Starting forecast...")
-            # 주가 예측
-            forecast = transformer_forecast(stock_data)
-
-            # NumPy 배열을 리스트로 변환
-            forecast_list = forecast.tolist()
-
-            # JSON 파일로 저장
-            json_path = f"output/{company}_forecast.json"
-            os.makedirs("output", exist_ok=True)
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(forecast_list, f, ensure_ascii=False, indent=4)
-            logging.info(f"Forecast JSON saved for {company} at {json_path}")
-
-            # CSV 파일로 저장
-            csv_path = f"output/{company}_forecast.csv"
-            pd.DataFrame(forecast_list).to_csv(csv_path, index=False)
-            logging.info(f"Forecast CSV saved for {company} at {csv_path}")
-
-            # LLM 호출
-            analysis_result = stock_chain.invoke({
-                "company": company,
-                "text": json.dumps(forecast_list, ensure_ascii=False)
-            })
-
-            logging.info(f"LLM analysis result for {company}: {analysis_result}")
-            result_dict[company] = analysis_result
-
+            future.result()
         except Exception as e:
-            logging.error(f"Error analyzing {company}: {str(e)}")
-            result_dict[company] = {"error": str(e)}
+            logging.error(f"Forecast export failed for {company}: {str(e)}")
 
-    # 결과를 state에 저장
-    state["stock_data"] = result_dict
+    # 결과를 state 업데이트로 반환
     logging.info("Stock price analysis completed. Results stored in state.")
-    return state
\ No newline at end of file
+    return {"stock_data": result_dict, "forecast_data": forecast_data}
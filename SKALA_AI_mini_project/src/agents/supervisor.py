@@ -1,55 +1,313 @@
 import sys
 import os
+import time
 import logging
+import importlib
 
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 sys.path.append(project_root)
 
-from langgraph.graph import StateGraph, START, END
-from typing import TypedDict
+from typing import Annotated, TypedDict
 
-# 에이전트 함수 임포트
-from src.agents.company_analysis import run_company_analysis
-from src.agents.market_analysis import run_battery_market_agent
-from src.agents.stock_price_predictor import predict_stock_prices
-from src.agents.data_visualizer import visualize_forecast_separately
-from src.agents.report_generator import generate_report
+from src.utils.instrumentation import RunMetrics, instrument_node, metrics_scope, scoped_metrics
+from src.utils.checkpointing import (
+    checkpoint_node, get_checkpointer, get_unit_store, has_error, input_fingerprint, invalidate_run, prune_runs,
+    run_scope,
+)
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+# ✅ 그래프 실행 모드 ("parallel": 독립 에이전트 동시 실행, "sequential": 기존 직렬 실행)
+GRAPH_MODE = os.getenv("GRAPH_MODE", "parallel")
 
-# 1. State 정의
+# 노드 이름 -> (에이전트 모듈, 함수). 에이전트 모듈은 torch, Chroma, ChatOpenAI 등을 임포트하므로 노드가 처음
+# 실행될 때 임포트 (supervisor 임포트/CLI 시작/API 워커 재시작 시간을 줄이기 위해)
+NODE_TARGETS = {
+    "market_research": ("src.agents.market_analysis", "run_battery_market_agent"),
+    "company_analysis": ("src.agents.company_analysis", "run_company_analysis"),
+    "stock_price_analysis": ("src.agents.stock_price_predictor", "predict_stock_prices"),
+    "data_visualization": ("src.agents.data_visualizer", "visualize_forecast_separately"),
+    "report_generation": ("src.agents.report_generator", "generate_report"),
+}
+
+# 노드별 담당 state 키 (체크포인트 재실행 시 오류가 난 노드를 찾는 데 사용)
+NODE_OUTPUTS = {
+    "market_research": ("market_data",),
+    "company_analysis": ("company_data",),
+    "stock_price_analysis": ("stock_data", "forecast_data"),
+    "data_visualization": ("visualization_data",),
+    "report_generation": ("report",),
+}
+
+# 노드별로 읽는 state 키 (None이면 state 전체). 재개 시 입력이 바뀌지 않은 노드는 저장된 결과를 재사용
+NODE_INPUTS = {
+    "market_research": ("run_config",),
+    "company_analysis": ("run_config",),
+    "stock_price_analysis": ("run_config",),
+    "data_visualization": ("run_config", "forecast_data"),
+    "report_generation": None,
+}
+
+# 1. State 키별 reducer 정의
+def merge_by_company(left, right):
+    """
+    기업별 결과(dict)를 병합하는 reducer. 같은 기업 키는 새 값으로 덮어씁니다.
+    """
+    if right is None:
+        return left
+    if isinstance(left, dict) and isinstance(right, dict):
+        return {**left, **right}
+    return right
+
+def keep_latest(left, right):
+    """
+    단일 결과를 보관하는 reducer. None 업데이트는 무시하고 마지막 값을 유지합니다.
+    """
+    return left if right is None else right
+
+# 2. State 정의
 class State(TypedDict):
-    company_data: dict
-    market_data: dict
-    stock_data: dict
-    visualization_data: dict
-    report: dict
-
-# 2. StateGraph 생성
-graph_builder = StateGraph(State)
-
-# 3. 노드 추가
-graph_builder.add_node("market_research", run_battery_market_agent)
-graph_builder.add_node("company_analysis", run_company_analysis)
-graph_builder.add_node("stock_price_analysis", predict_stock_prices)
-graph_builder.add_node("data_visualization", visualize_forecast_separately)
-graph_builder.add_node("report_generation", generate_report)
-
-# 4. 엣지 추가 (흐름 정의)
-graph_builder.add_edge(START, "market_research")
-graph_builder.add_edge("market_research", "company_analysis")
-graph_builder.add_edge("company_analysis", "stock_price_analysis")
-graph_builder.add_edge("stock_price_analysis", "data_visualization")
-graph_builder.add_edge("data_visualization", "report_generation")
-graph_builder.add_edge("report_generation", END)
-
-# 5. 그래프 컴파일
-graph = graph_builder.compile()
-
-# 6. Supervisor 실행
+    company_data: Annotated[dict, merge_by_company]
+    market_data: Annotated[dict, keep_latest]
+    stock_data: Annotated[dict, merge_by_company]
+    forecast_data: Annotated[dict, merge_by_company]  # 기업명 -> {"dates": datetime64 배열, "values": float64 배열}
+    visualization_data: Annotated[dict, merge_by_company]
+    report: Annotated[dict, keep_latest]
+    run_config: Annotated[dict, keep_latest]  # 실행 입력 (watchlist: 기업명 -> 티커, report_dir, output_dir 등, 선택)
+
+# 3. StateGraph 생성
+def lazy_node(module_name: str, attr: str):
+    """
+    첫 실행 시 에이전트 모듈을 임포트해 함수를 호출하는 노드를 만듭니다. 호출할 때마다 모듈 속성을 조회하므로
+    모듈의 함수를 교체(벤치마크 등)해도 반영됩니다.
+    """
+    def node(state):
+        return getattr(importlib.import_module(module_name), attr)(state)
+
+    node.__name__ = node.__qualname__ = attr
+    return node
+
+
+def load_nodes():
+    """
+    모든 에이전트 모듈을 미리 임포트합니다. (API 워밍업 등 첫 실행 지연을 없애고 싶을 때)
+    """
+    for module_name, _ in NODE_TARGETS.values():
+        importlib.import_module(module_name)
+
+
+def build_graph(mode: str = GRAPH_MODE):
+    """
+    Supervisor 그래프를 구성합니다.
+
+    Args:
+        mode (str): "parallel"이면 시장 조사/기업 분석/주가 예측을 동시에 실행(fan-out)하고
+            report_generation에서 모든 결과를 기다립니다(fan-in). "sequential"이면 기존 직렬 흐름을 사용합니다.
+
+    Returns:
+        StateGraph: 컴파일 전 그래프 빌더
+    """
+    from langgraph.graph import StateGraph, START, END
+
+    builder = StateGraph(State)
+
+    # 노드 추가 (모든 노드는 시간/메모리 계측 래퍼와 노드 결과 체크포인트 래퍼로 감쌈)
+    for name, (module_name, attr) in NODE_TARGETS.items():
+        node = checkpoint_node(name, lazy_node(module_name, attr), inputs=NODE_INPUTS[name])
+        builder.add_node(name, instrument_node(name, node))
+
+    # 엣지 추가 (흐름 정의)
+    if mode == "parallel":
+        builder.add_edge(START, "market_research")
+        builder.add_edge(START, "company_analysis")
+        builder.add_edge(START, "stock_price_analysis")
+        builder.add_edge("stock_price_analysis", "data_visualization")
+        builder.add_edge(["market_research", "company_analysis", "data_visualization"], "report_generation")
+    elif mode == "sequential":
+        builder.add_edge(START, "market_research")
+        builder.add_edge("market_research", "company_analysis")
+        builder.add_edge("company_analysis", "stock_price_analysis")
+        builder.add_edge("stock_price_analysis", "data_visualization")
+        builder.add_edge("data_visualization", "report_generation")
+    else:
+        raise ValueError(f"지원하지 않는 그래프 모드입니다: {mode}")
+    builder.add_edge("report_generation", END)
+    return builder
+
+# 4. 그래프 컴파일 (최초 사용 시 한 번만 구성)
+_graph_builder = None
+_graph = None
+
+def get_graph_builder():
+    global _graph_builder
+    if _graph_builder is None:
+        _graph_builder = build_graph()
+    return _graph_builder
+
+
+def get_graph():
+    """
+    체크포인트 없이 컴파일한 그래프.
+    """
+    global _graph
+    if _graph is None:
+        _graph = get_graph_builder().compile()
+    return _graph
+
+
+def __getattr__(name):
+    # 기존 코드의 `from src.agents.supervisor import graph` 호환 (모듈 임포트 시점에 컴파일하지 않음)
+    if name == "graph":
+        return get_graph()
+    if name == "graph_builder":
+        return get_graph_builder()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 5. 스트리밍 실행
+def stream_graph(initial_state, show_tokens: bool = True, app=None, config=None):
+    """
+    그래프를 스트리밍 모드로 실행합니다. 노드가 끝날 때마다 진행 상황을 출력하고 해당 보고서 섹션을 실행의 보고서
+    디렉토리(run_config.report_dir)에 바로 저장하며, show_tokens가 True면 세 LLM 체인의 토큰을 생성되는 대로 출력합니다.
+
+    Args:
+        initial_state (dict): 초기 상태 (체크포인트에서 이어서 실행할 때는 None)
+        show_tokens (bool): LLM 토큰 출력 여부
+        app: 실행할 컴파일된 그래프 (기본값: graph)
+        config (dict): 그래프 실행 설정 (체크포인트 thread_id 등)
+
+    Returns:
+        dict: 최종 상태
+    """
+    from src.agents.report_generator import write_section
+
+    start = time.perf_counter()
+    final_state = initial_state
+    current_stream = None
+
+    app = app or get_graph()
+    # 체크포인트에서 이어서 실행할 때는 저장된 state의 run_config를 사용
+    state = initial_state if initial_state is not None else app.get_state(config).values
+    report_dir = ((state or {}).get("run_config") or {}).get("report_dir")
+    for mode, payload in app.stream(initial_state, config, stream_mode=["updates", "messages", "values"]):
+        if mode == "messages":
+            chunk, metadata = payload
+            if not show_tokens or not isinstance(chunk.content, str) or not chunk.content:
+                continue
+            stream_key = (metadata.get("langgraph_node"), tuple(metadata.get("tags") or ()))
+            if stream_key != current_stream:
+                label = "/".join([stream_key[0] or "llm", *stream_key[1]])
+                print(f"\n[{label}] ", end="")
+                current_stream = stream_key
+            print(chunk.content, end="", flush=True)
+        elif mode == "updates":
+            for node, update in payload.items():
+                current_stream = None
+                print(f"\n✅ {node} 완료 ({time.perf_counter() - start:.1f}s)")
+                for key, value in (update or {}).items():
+                    section_path = write_section(key, value, report_dir)
+                    if section_path:
+                        print(f"   섹션 저장: {section_path}")
+        else:
+            final_state = payload
+
+    return final_state
+
+# 6. 체크포인트 실행 (실패한 단계부터 재개)
+_checkpointed_graph = None
+
+def get_checkpointed_graph():
+    """
+    SQLite 체크포인터로 컴파일한 그래프. 노드가 끝날 때마다 state가 저장됩니다.
+    """
+    global _checkpointed_graph
+    if _checkpointed_graph is None:
+        _checkpointed_graph = get_graph_builder().compile(checkpointer=get_checkpointer())
+    return _checkpointed_graph
+
+
+def failed_nodes(values: dict):
+    """
+    state에서 오류 결과를 담고 있는 노드 목록을 반환합니다.
+    """
+    return [node for node, keys in NODE_OUTPUTS.items() if any(has_error(values.get(key)) for key in keys)]
+
+
+def resume_config(app, config: dict, failed):
+    """
+    완료된 실행에서 오류가 난 노드를 다시 실행할 체크포인트 설정을 찾습니다. 실패한 노드를 실행하기 직전의
+    가장 최근 체크포인트에서 다시 시작하므로 이전 단계는 다시 계산하지 않습니다. 같은 단계에서 함께 실행된
+    형제 노드(parallel 모드의 fan-out)도 다시 실행되지만, 입력이 같으면 checkpoint_node가 저장된 결과를 반환합니다.
+    """
+    candidate = config
+    for snapshot in app.get_state_history(config):
+        if any(node in failed for node in snapshot.next):
+            candidate = snapshot.config
+    # get_state_history는 최신 순이므로 마지막으로 찾은 값이 가장 이른(모든 실패 노드를 포함하는) 체크포인트
+    return candidate
+
+
+def run_graph(initial_state, run_id: str = None, fresh: bool = False, stream: bool = False, metrics: RunMetrics = None):
+    """
+    체크포인트를 사용해 그래프를 실행합니다. 같은 run id로 다시 실행하면 끝난 노드와 기업 단위 작업은 건너뛰고
+    실패한 단계만 다시 실행합니다. 실행 전에 보관 기간/개수를 넘은 이전 실행의 체크포인트를 정리합니다.
+
+    Args:
+        initial_state (dict): 초기 상태
+        run_id (str): 실행 id (기본값: 입력 해시. 입력(run_config, 실행 모드, 날짜)이 같으면 같은 id). 지정한 id는
+            날짜가 바뀌어도 입력이 같으면 이어서 실행
+        fresh (bool): True면 기존 체크포인트를 지우고 처음부터 실행
+        stream (bool): True면 stream_graph로 진행 상황을 출력
+        metrics (RunMetrics): 이 실행의 계측 기록을 모을 인스턴스 (기본값: 호출한 쪽의 metrics_scope, 없으면 실행마다
+            새 인스턴스)
+
+    Returns:
+        dict: 최종 상태 (run_config.run_id에 실행 id 포함)
+    """
+    # 체크포인트 재사용 여부는 날짜를 뺀 입력으로 판단 (--run-id로 자정 이후에 재개해도 이어서 실행)
+    inputs = {"graph_mode": GRAPH_MODE, "forecast_mode": os.getenv("FORECAST_MODE", "per_ticker")}
+    fingerprint = input_fingerprint(initial_state, **inputs)
+    run_id = run_id or input_fingerprint(initial_state, **inputs, date=time.strftime("%Y-%m-%d"))[:16]
+    app = get_checkpointed_graph()
+    get_unit_store().touch_run(run_id)
+    try:
+        prune_runs(keep=run_id)
+    except Exception as e:
+        logging.warning(f"Failed to prune old checkpoints: {str(e)}")
+    config = {"configurable": {"thread_id": run_id}}
+
+    snapshot = app.get_state(config)
+    if snapshot.values and (fresh or (snapshot.values.get("run_config") or {}).get("input_hash") != fingerprint):
+        # 입력이 바뀐 실행은 이어서 하지 않고 처음부터 다시 계산
+        logging.info(f"Run {run_id}: {'fresh run requested' if fresh else 'inputs changed'}, discarding checkpoints")
+        invalidate_run(run_id)
+        snapshot = app.get_state(config)
+
+    if not snapshot.values:
+        graph_input = {**initial_state, "run_config": {**(initial_state.get("run_config") or {}),
+                                                       "input_hash": fingerprint, "run_id": run_id}}
+        logging.info(f"Run {run_id}: starting")
+    elif snapshot.next:
+        graph_input = None  # 예외로 중단된 실행: 남은 노드만 실행
+        logging.info(f"Run {run_id}: resuming at {list(snapshot.next)}")
+    elif failed_nodes(snapshot.values):
+        failed = failed_nodes(snapshot.values)
+        graph_input, config = None, resume_config(app, config, failed)
+        logging.info(f"Run {run_id}: re-running failed nodes {failed}")
+    else:
+        logging.info(f"Run {run_id}: already complete, returning checkpointed state")
+        return snapshot.values
+
+    with run_scope(run_id), metrics_scope(metrics or scoped_metrics()):
+        if stream:
+            return stream_graph(graph_input, app=app, config=config)
+        return app.invoke(graph_input, config)
+
+# 7. Supervisor 실행
 if __name__ == "__main__":
+    from src.utils.llm_cache import get_llm_cache
+    from src.utils.vectorstore_registry import load_times
+
+    # 로깅 설정 (라이브러리로 임포트될 때는 호출한 쪽의 설정을 따름)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     print("Supervisor 실행 시작")
 
     # 초기 상태 정의
@@ -57,6 +315,7 @@ if __name__ == "__main__":
         "company_data": None,         # 기업 분석 결과
         "market_data": None,          # 시장 분석 결과
         "stock_data": None,           # 주가 예측 결과
+        "forecast_data": None,        # 예측값 (NumPy 배열)
         "visualization_data": None,   # 시각화 데이터
         "report": None                # 최종 보고서
     }
@@ -65,7 +324,19 @@ if __name__ == "__main__":
 
     try:
         # 그래프 실행
-        result = graph.invoke(initial_state)
+        #   --stream: 노드 진행 상황과 LLM 토큰을 실시간 출력
+        #   --run-id <id>: 해당 실행을 체크포인트에서 재개 (기본값: 입력 해시)
+        #   --fresh: 체크포인트를 지우고 처음부터 실행
+        #   --no-checkpoint: 체크포인트 없이 실행
+        run_id = sys.argv[sys.argv.index("--run-id") + 1] if "--run-id" in sys.argv else None
+        metrics = RunMetrics()
+        if "--no-checkpoint" in sys.argv:
+            with metrics_scope(metrics):
+                result = stream_graph(initial_state) if "--stream" in sys.argv else get_graph().invoke(initial_state)
+        else:
+            result = run_graph(initial_state, run_id=run_id, fresh="--fresh" in sys.argv, stream="--stream" in sys.argv,
+                               metrics=metrics)
+            print("실행 id (재개: --run-id):", (result.get("run_config") or {}).get("run_id"))
 
         # 실행 결과 출력
         print("Supervisor 실행 완료")
@@ -74,6 +345,12 @@ if __name__ == "__main__":
         print("최종 보고서 경로:", result.get("report", {}).get("file_path", "보고서 생성 실패"))
         print("최종 보고서 요약:")
         print(result.get("report", {}).get("summary", "요약 없음"))
+        print("LLM 캐시 통계:", get_llm_cache().stats())
+        print("모델/벡터 DB 로드 시간(초):", load_times())
+
+        # 노드/기업별 계측 결과 (JSON Lines + 요약 표)
+        print("계측 결과 저장:", metrics.export_jsonl())
+        print(metrics.format_summary())
     except Exception as e:
         logging.error(f"Supervisor 실행 중 오류 발생: {e}")
-        print(f"Supervisor 실행 중 오류 발생: {e}")
\ No newline at end of file
+        print(f"Supervisor 실행 중 오류 발생: {e}")
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+# ✅ 서비스 설정
+API_MAX_JOBS = int(os.getenv("API_MAX_JOBS", "2"))          # 동시에 실행할 보고서 작업 수
+API_WARMUP = os.getenv("API_WARMUP", "1") == "1"             # 시작 시 임베딩/벡터 DB 미리 로드
+API_JOB_RETENTION = int(os.getenv("API_JOB_RETENTION", str(24 * 3600)))  # 끝난 작업을 조회용으로 보관하는 시간(초)
+API_MAX_FINISHED_JOBS = int(os.getenv("API_MAX_FINISHED_JOBS", "200"))    # 보관할 끝난 작업 수 상한
+JOBS_DIR = os.getenv("API_JOBS_DIR", "./results/jobs")
+ARTIFACTS_DIR = os.getenv("API_ARTIFACTS_DIR", "./cache/artifacts")
+
+
+class ReportRequest(BaseModel):
+    watchlist: Dict[str, str]   # 기업명 -> 티커
+    keyword: Optional[str] = None
+
+
+def request_key(request: ReportRequest, run_date: str = None) -> str:
+    """
+    요청 내용과 실행 날짜를 정규화해 작업 id(해시)를 만듭니다. 같은 날의 같은 요청은 같은 id를 가지며, 다음 날에는
+    새 데이터로 다시 실행합니다. (그래프 체크포인트의 입력 해시와 같은 날짜 단위)
+    """
+    run_date = run_date or time.strftime("%Y-%m-%d")
+    payload = json.dumps({**request.model_dump(), "run_date": run_date}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def store_artifact(path: str, artifacts_dir: str = ARTIFACTS_DIR) -> str:
+    """
+    파일을 내용 해시 이름으로 보관하고 해시를 반환합니다.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    content_hash = digest.hexdigest()
+    os.makedirs(artifacts_dir, exist_ok=True)
+    target = os.path.join(artifacts_dir, content_hash + os.path.splitext(path)[1])
+    if not os.path.exists(target):
+        shutil.copyfile(path, target)
+    return content_hash
+
+
+def default_runner(state: dict) -> dict:
+    """
+    Supervisor 그래프를 체크포인트와 함께 실행합니다. 실패한 작업을 다시 요청하면 실패한 단계부터 재개합니다.
+    그래프는 최초 호출 시 한 번만 임포트됩니다.
+    """
+    from src.agents.supervisor import run_graph
+
+    return run_graph(state)
+
+
+def warm_up():
+    """
+    그래프(에이전트 모듈)와 임베딩 모델, 벡터 DB를 미리 로드해 첫 작업의 지연을 줄입니다.
+    """
+    from src.agents.supervisor import load_nodes
+    from src.utils.vectorstore_registry import get_vector_store
+
+    load_nodes()
+
+    for name in ("company", "battery"):
+        get_vector_store(name)
+
+
+class JobManager:
+    """
+    보고서 작업을 제한된 크기의 워커 풀에서 실행합니다. 같은 날의 같은 요청이 진행 중이거나 완료되었으면 새로
+    실행하지 않고 기존 작업을 반환합니다. 끝난 작업은 retention 동안(최대 max_finished개) 조회용으로 보관합니다.
+
+    Args:
+        runner (Callable): 초기 state를 받아 최종 state를 반환하는 함수 (테스트에서는 스텁으로 교체)
+        max_jobs (int): 동시에 실행할 작업 수
+        retention (int): 끝난 작업을 보관하는 시간(초)
+        max_finished (int): 보관할 끝난 작업 수 상한
+    """
+
+    def __init__(self, runner=default_runner, max_jobs: int = API_MAX_JOBS,
+                 jobs_dir: str = JOBS_DIR, artifacts_dir: str = ARTIFACTS_DIR,
+                 retention: int = API_JOB_RETENTION, max_finished: int = API_MAX_FINISHED_JOBS):
+        self.runner = runner
+        self.jobs_dir = jobs_dir
+        self.artifacts_dir = artifacts_dir
+        self.retention = retention
+        self.max_finished = max_finished
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="report-job")
+
+    def submit(self, request: ReportRequest) -> dict:
+        job_id = request_key(request)
+        with self._lock:
+            self._evict_finished()
+            job = self.jobs.get(job_id)
+            if job is not None and job["status"] != "failed":
+                return dict(job)
+            job = {"job_id": job_id, "status": "queued", "request": request.model_dump(), "submitted_at": time.time()}
+            self.jobs[job_id] = job
+            response = dict(job)
+        self._executor.submit(self._run, job_id, request)
+        return response
+
+    def get(self, job_id: str):
+        with self._lock:
+            self._evict_finished()
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def _evict_finished(self):
+        """
+        보관 시간이 지났거나 상한을 넘은 끝난 작업(done/failed)을 목록에서 제거합니다. (self._lock 안에서 호출)
+        """
+        finished = sorted(
+            (job for job in self.jobs.values() if job["status"] in ("done", "failed")),
+            key=lambda job: job["finished_at"],
+        )
+        now = time.time()
+        excess = len(finished) - self.max_finished
+        for i, job in enumerate(finished):
+            if i < excess or now - job["finished_at"] >= self.retention:
+                del self.jobs[job["job_id"]]
+
+    def _run(self, job_id: str, request: ReportRequest):
+        from src.utils.instrumentation import RunMetrics, metrics_scope
+
+        self._update(job_id, status="running", started_at=time.time())
+        report_dir = os.path.join(self.jobs_dir, job_id)
+        initial_state = {
+            "company_data": None,
+            "market_data": None,
+            "stock_data": None,
+            "forecast_data": None,
+            "visualization_data": None,
+            "report": None,
+            # 차트/예측 내보내기도 작업 디렉토리에 저장해 동시에 실행되는 작업끼리 파일을 덮어쓰지 않도록 함
+            "run_config": {"watchlist": request.watchlist, "keyword": request.keyword, "report_dir": report_dir,
+                           "output_dir": os.path.join(report_dir, "output")},
+        }
+        # 작업마다 별도의 계측 기록 (노드/기업별 시간, RSS 증가분, 토큰 사용량)
+        metrics = RunMetrics()
+        try:
+            with metrics_scope(metrics):
+                result = self.runner(initial_state)
+            report = result.get("report") or {}
+            if "error" in report:
+                raise RuntimeError(report["error"])
+            artifacts = {}
+            for kind, key in (("pdf", "file_path"), ("html", "html_path")):
+                if report.get(key) and os.path.exists(report[key]):
+                    artifacts[kind] = store_artifact(report[key], self.artifacts_dir)
+            artifacts.update(self._export_metrics(metrics, report_dir))
+            self._update(job_id, status="done", finished_at=time.time(), artifacts=artifacts,
+                         summary=report.get("summary"), metrics=metrics.summary())
+        except Exception as e:
+            logging.error(f"Report job {job_id} failed: {str(e)}")
+            self._update(job_id, status="failed", finished_at=time.time(), error=str(e),
+                         artifacts=self._export_metrics(metrics, report_dir), metrics=metrics.summary())
+
+    def _export_metrics(self, metrics, report_dir: str) -> dict:
+        """
+        작업의 계측 기록을 작업 디렉토리에 JSON Lines로 저장하고 아티팩트로 보관합니다.
+
+        Returns:
+            dict: {"metrics": 내용 해시} (저장 실패 시 빈 dict)
+        """
+        try:
+            path = metrics.export_jsonl(os.path.join(report_dir, "metrics.jsonl"))
+            return {"metrics": store_artifact(path, self.artifacts_dir)}
+        except Exception as e:
+            logging.error(f"Failed to export metrics to {report_dir}: {str(e)}")
+            return {}
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self.jobs[job_id].update(fields)
+
+    def artifact_path(self, content_hash: str):
+        for file_name in os.listdir(self.artifacts_dir) if os.path.isdir(self.artifacts_dir) else []:
+            if os.path.splitext(file_name)[0] == content_hash:
+                return os.path.join(self.artifacts_dir, file_name)
+        return None
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_app(runner=default_runner, warmup: bool = API_WARMUP, **manager_kwargs) -> FastAPI:
+    """
+    보고서 API 앱을 생성합니다.
+
+    Args:
+        runner (Callable): 그래프 실행 함수 (테스트에서는 LLM/yfinance 스텁을 쓰는 함수로 교체)
+        warmup (bool): 시작 시 임베딩 모델/벡터 DB를 미리 로드할지 여부
+        **manager_kwargs: JobManager 설정 (max_jobs, jobs_dir, artifacts_dir)
+    """
+    manager = JobManager(runner=runner, **manager_kwargs)
+
+    @asynccontextmanager
+    async def lifespan(_):
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+        if warmup:
+            threading.Thread(target=warm_up, daemon=True).start()
+        yield
+        manager.shutdown()
+
+    app = FastAPI(title="Battery Industry Report API", lifespan=lifespan)
+    app.state.jobs = manager
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.post("/reports", status_code=202)
+    def create_report(request: ReportRequest):
+        if not request.watchlist:
+            raise HTTPException(status_code=400, detail="watchlist가 비어 있습니다.")
+        return manager.submit(request)
+
+    @app.get("/reports/{job_id}")
+    def get_report(job_id: str):
+        job = manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+        return job
+
+    @app.get("/artifacts/{content_hash}")
+    def get_artifact(content_hash: str):
+        path = manager.artifact_path(content_hash)
+        if path is None:
+            raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
+        return FileResponse(path, headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+    return app
+
+
+# 실행: uvicorn src.api.server:app (프로젝트 루트에서)
+app = create_app()
@@ -0,0 +1,272 @@
+import os
+import sys
+import glob
+import logging
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ✅ 가격 저장소 설정
+RAW_DIR = "raw"
+PRICE_STORE_OFFLINE = os.getenv("PRICE_STORE_OFFLINE", "0") == "1"
+PRICE_COLUMNS = ["Close", "High", "Low", "Open", "Volume"]
+
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    yfinance의 (Price, Ticker) 멀티 컬럼을 단일 컬럼으로 정리하고 날짜 인덱스를 정렬합니다.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.droplevel(1, axis=1) if df.columns.nlevels > 1 else df
+    df = df[[c for c in PRICE_COLUMNS if c in df.columns]].copy()
+    df.index = pd.to_datetime(df.index)
+    df.index.name = "Date"
+    df.columns.name = "Price"
+    return df.sort_index()
+
+
+def read_legacy_csv(path: str) -> pd.DataFrame:
+    """
+    yfinance가 저장한 3줄 헤더(Price/Ticker/Date) CSV를 읽습니다.
+    """
+    df = pd.read_csv(path, header=[0, 1], index_col=0, parse_dates=True)
+    return normalize_ohlcv(df).astype("float64")
+
+
+def period_start(period: str, today: pd.Timestamp):
+    """
+    yfinance 형식의 기간 문자열("1y", "6mo", "5d", "max" 등)을 시작 날짜로 변환합니다.
+    """
+    if period in (None, "max"):
+        return None
+    units = {"y": "years", "mo": "months", "wk": "weeks", "d": "days"}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return today - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"지원하지 않는 기간 형식입니다: {period}")
+
+
+class YFinanceSource:
+    """
+    yfinance에서 지정한 날짜 구간의 OHLCV 데이터를 가져오는 기본 데이터 소스. 기업별 스레드에서 동시에 호출됩니다.
+    """
+
+    def fetch(self, ticker: str, start=None, end=None, interval: str = "1d") -> pd.DataFrame:
+        import yfinance as yf
+
+        # yf.download는 결과를 모듈 전역 딕셔너리(shared._DFS 등)에 모으므로 여러 스레드에서 호출하면 결과가 섞일 수
+        # 있음. yf.download도 내부 스레드마다 Ticker.history를 호출하므로, 티커별 Ticker.history는 락 없이 동시에
+        # 호출해도 안전 (네트워크 대기 구간이 기업별로 겹침)
+        history = yf.Ticker(ticker).history
+        if start is None:
+            df = history(period="max", interval=interval)
+        else:
+            df = history(start=start, end=end, interval=interval)
+        if df.empty:
+            return df
+        df = normalize_ohlcv(df)
+        if df.index.tz is not None:
+            # Ticker.history는 거래소 시간대의 인덱스를 반환하므로 저장소 형식(시간대 없는 날짜)에 맞춤
+            df.index = df.index.tz_localize(None)
+        return df
+
+
+class PriceStore:
+    """
+    raw/<company>.parquet에 누적되는 로컬 주가 저장소. 디스크에 있는 이력을 읽고, 빠진 구간만 데이터 소스에서
+    받아와 날짜 기준으로 중복을 제거해 덧붙입니다. offline 모드에서는 디스크 데이터만 사용합니다.
+
+    Args:
+        root (str): Parquet 저장 디렉토리
+        source: fetch(ticker, start, end, interval)를 구현한 데이터 소스 (테스트에서는 로컬 스텁으로 교체)
+        offline (bool): True면 네트워크 요청 없이 디스크 데이터만 반환
+    """
+
+    def __init__(self, root: str = RAW_DIR, source=None, offline: bool = PRICE_STORE_OFFLINE):
+        self.root = root
+        self.source = source or YFinanceSource()
+        self.offline = offline
+
+    def path(self, company_name: str) -> str:
+        return os.path.join(self.root, f"{company_name}.parquet")
+
+    def legacy_path(self, company_name: str) -> str:
+        return os.path.join(self.root, f"{company_name}.csv")
+
+    def load(self, company_name: str, columns=None) -> pd.DataFrame:
+        """
+        디스크에 저장된 이력을 DatetimeIndex + float64 데이터프레임으로 반환합니다.
+        Parquet 파일이 없고 기존 CSV만 있으면 먼저 Parquet으로 변환합니다. 없으면 빈 데이터프레임을 반환합니다.
+
+        Args:
+            company_name (str): 기업명
+            columns (list): 읽을 컬럼 (기본값: 전체 OHLCV). 지정한 컬럼만 메모리 매핑으로 읽습니다.
+        """
+        columns = list(columns or PRICE_COLUMNS)
+        path = self.path(company_name)
+        if not os.path.exists(path):
+            if not os.path.exists(self.legacy_path(company_name)):
+                return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="Date"), dtype="float64")
+            self.migrate(company_name)
+        table = pq.read_table(path, columns=columns + ["Date"], memory_map=True)
+        df = table.to_pandas().set_index("Date")
+        df.columns.name = "Price"
+        return df.astype("float64")
+
+    def ticker(self, company_name: str):
+        """
+        Parquet 메타데이터에 기록된 티커를 반환합니다.
+        """
+        metadata = pq.read_schema(self.path(company_name)).metadata or {}
+        value = metadata.get(b"ticker")
+        return value.decode("utf-8") if value else None
+
+    def coverage_start(self, company_name: str):
+        """
+        데이터 소스에 요청해 받아 둔 가장 이른 시작 날짜를 반환합니다. ("max"로 받았으면 pd.Timestamp.min)
+        상장일 이전처럼 소스에 데이터가 없는 구간을 매번 다시 요청하지 않는 데 사용합니다. 기록이 없으면 None.
+        """
+        if not os.path.exists(self.path(company_name)):
+            return None
+        value = (pq.read_schema(self.path(company_name)).metadata or {}).get(b"coverage_start")
+        return pd.Timestamp(value.decode("utf-8")) if value else None
+
+    def save(self, company_name: str, ticker: str, df: pd.DataFrame, coverage_start=None):
+        """
+        이력을 Parquet으로 저장합니다. 티커와 요청한 시작 날짜(coverage_start, 기본값: 첫 행 날짜)는 스키마
+        메타데이터에 기록하며, 임시 파일에 쓴 뒤 교체합니다.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        out = df.astype("float64").reset_index()
+        out.columns.name = None
+        if coverage_start is None and not df.empty:
+            coverage_start = df.index[0]
+        table = pa.Table.from_pandas(out, preserve_index=False)
+        metadata = {**(table.schema.metadata or {}), b"ticker": ticker.encode("utf-8")}
+        if coverage_start is not None:
+            metadata[b"coverage_start"] = coverage_start.isoformat().encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+        # 여러 작업이 같은 기업을 동시에 저장할 수 있으므로 호출마다 고유한 임시 파일에 쓴 뒤 원자적으로 교체
+        with tempfile.NamedTemporaryFile(dir=self.root, suffix=".tmp", delete=False) as tmp:
+            try:
+                pq.write_table(table, tmp)
+            except Exception:
+                tmp.close()
+                os.remove(tmp.name)
+                raise
+        os.replace(tmp.name, self.path(company_name))
+
+    def migrate(self, company_name: str):
+        """
+        기존 raw/<company>.csv를 Parquet으로 변환합니다.
+        """
+        csv_path = self.legacy_path(company_name)
+        header = pd.read_csv(csv_path, skiprows=1, nrows=1, header=None).iloc[0].tolist()
+        ticker = str(header[1]) if len(header) > 1 and header[0] == "Ticker" else ""
+        self.save(company_name, ticker, read_legacy_csv(csv_path))
+        logging.info(f"Migrated {csv_path} -> {self.path(company_name)}")
+
+    def update(self, company_name: str, ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """
+        빠진 구간만 받아 이력을 갱신하고, 요청한 기간에 해당하는 구간을 반환합니다. 마지막 저장일 이후 구간과,
+        요청한 기간이 저장된 이력보다 앞서면 그 앞 구간도 받습니다. 새 데이터를 받지 못하면(offline 모드, 수집 실패,
+        빈 응답) 디스크에 저장된 마지막 날짜부터 기간을 거슬러 계산해 저장된 이력을 반환합니다.
+
+        Args:
+            company_name (str): 기업명 (파일명으로 사용)
+            ticker (str): 종목 티커
+            period (str): 반환할 기간 (예: "1y")
+            interval (str): 데이터 간격
+
+        Returns:
+            pd.DataFrame: Date 인덱스와 OHLCV 컬럼을 가진 데이터프레임
+        """
+        today = pd.Timestamp.today().normalize()
+        history = self.load(company_name)
+        requested = period_start(period, today)
+        requested = pd.Timestamp.min if requested is None else requested  # "max"는 가능한 가장 이른 날짜부터
+        fetched = changed = False  # fetched: 마지막 저장일 이후 구간을 받았는지
+
+        if not self.offline:
+            if history.empty:
+                ranges = [("all", requested, None)]
+            else:
+                # 마지막 저장일부터 다시 받아 장중에 저장된 미완성 봉을 갱신
+                ranges = [("tail", history.index[-1], None)] if history.index[-1] <= today else []
+                covered = self.coverage_start(company_name) or history.index[0]
+                if requested < covered:
+                    # 요청한 기간이 저장된 이력보다 앞서면 첫 저장일 이전 구간을 채움 (end는 포함하지 않음)
+                    ranges.append(("head", requested, history.index[0]))
+            end_of_today = today + pd.Timedelta(days=1)
+
+            covered = self.coverage_start(company_name)
+            for label, start, end in ranges:
+                try:
+                    new = self.source.fetch(
+                        ticker,
+                        start=None if start == pd.Timestamp.min else start.strftime("%Y-%m-%d"),
+                        end=(end if end is not None else end_of_today).strftime("%Y-%m-%d"),
+                        interval=interval,
+                    )
+                except Exception as e:
+                    if history.empty:
+                        raise
+                    logging.warning(f"{company_name}: 주가 데이터 수집 실패 ({label}, {str(e)})")
+                    continue
+                if label != "tail":
+                    covered = min(covered, start) if covered is not None else start
+                if new is not None and not new.empty:
+                    new = normalize_ohlcv(new)
+                    merged = pd.concat([history, new]) if not history.empty else new
+                    history = merged[~merged.index.duplicated(keep="last")].sort_index()
+                    fetched, changed = fetched or label != "head", True
+                    logging.info(f"{company_name}: {len(new)} rows fetched ({label}), {len(history)} rows on disk")
+            if not history.empty and (changed or covered != self.coverage_start(company_name)):
+                self.save(company_name, ticker, history, coverage_start=covered)
+
+        if history.empty:
+            raise ValueError(f"{company_name}에 대한 데이터를 가져올 수 없습니다. 티커: {ticker}, 기간: {period}, 간격: {interval}")
+
+        start = period_start(period, today)
+        if not fetched or (start is not None and history.index[-1] < start):
+            # 새 데이터가 없으면 오늘이 아닌 마지막 저장일 기준으로 기간을 계산 (오래된 이력도 그대로 사용)
+            anchor = history.index[-1].normalize()
+            log = logging.info if self.offline else logging.warning
+            log(f"{company_name}: 새 데이터가 없어 {anchor.date()}까지 저장된 이력을 사용합니다.")
+            start = period_start(period, anchor)
+        if start is not None:
+            history = history[history.index >= start]
+        return history
+
+
+_default_store = None
+
+def get_price_store() -> PriceStore:
+    """
+    기본 설정의 전역 PriceStore를 반환합니다.
+    """
+    global _default_store
+    if _default_store is None:
+        _default_store = PriceStore()
+    return _default_store
+
+
+def migrate_all(root: str = RAW_DIR):
+    """
+    root 디렉토리의 모든 CSV를 Parquet으로 한 번에 변환합니다. 이미 변환된 파일은 건너뜁니다.
+    """
+    store = PriceStore(root=root, offline=True)
+    migrated = []
+    for csv_path in sorted(glob.glob(os.path.join(root, "*.csv"))):
+        company_name = os.path.splitext(os.path.basename(csv_path))[0]
+        if not os.path.exists(store.path(company_name)):
+            store.migrate(company_name)
+            migrated.append(company_name)
+    return migrated
+
+
+if __name__ == "__main__":
+    # 사용법: python -m src.fetcher.price_store [raw 디렉토리]
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    print("변환 완료:", migrate_all(sys.argv[1] if len(sys.argv) > 1 else RAW_DIR))
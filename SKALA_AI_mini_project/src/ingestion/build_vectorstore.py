@@ -0,0 +1,161 @@
+import os
+import re
+import sys
+import time
+import hashlib
+import logging
+
+from src.ingestion.company_tags import tag_chunk
+from src.utils.vectorstore_registry import get_vector_store
+
+# ✅ 수집 설정
+PDF_DIR = "./pdfs"
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 100
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".md")
+HASH_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")  # chunk_id 형식. 그 밖의 id(UUID)는 해시 id 도입 전에 만든 청크
+
+
+def iter_documents(source_dir: str = PDF_DIR):
+    """
+    source_dir의 문서를 파일 단위로 하나씩 읽어 페이지 Document를 순서대로 내보냅니다.
+    """
+    from langchain_community.document_loaders import PyPDFLoader, TextLoader
+
+    for root, _, files in os.walk(source_dir):
+        for file_name in sorted(files):
+            path = os.path.join(root, file_name)
+            ext = os.path.splitext(file_name)[1].lower()
+            if ext not in SUPPORTED_EXTENSIONS:
+                continue
+            loader = PyPDFLoader(path) if ext == ".pdf" else TextLoader(path, encoding="utf-8")
+            try:
+                yield from loader.lazy_load()
+            except Exception as e:
+                logging.error(f"문서를 읽지 못했습니다 ({path}): {str(e)}")
+
+
+def chunk_id(chunk) -> str:
+    """
+    출처 경로와 본문으로 청크 해시(=벡터 DB id)를 계산합니다. 내용이 바뀌면 id도 바뀝니다.
+    """
+    source = os.path.normpath(str(chunk.metadata.get("source", "")))
+    return hashlib.sha256(f"{source}\n{chunk.page_content}".encode("utf-8")).hexdigest()
+
+
+def iter_chunks(source_dir: str = PDF_DIR, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP,
+                tag_companies: bool = True):
+    """
+    문서를 청크로 나누고 해시와 (필요하면) 기업 메타데이터를 붙여 (id, Document)로 내보냅니다.
+    같은 출처의 동일한 청크는 한 번만 내보냅니다.
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    seen = set()
+    for page in iter_documents(source_dir):
+        for chunk in splitter.split_documents([page]):
+            cid = chunk_id(chunk)
+            if cid in seen:
+                continue
+            seen.add(cid)
+            if tag_companies:
+                chunk.metadata = tag_chunk(chunk.page_content, chunk.metadata)
+            chunk.metadata["chunk_hash"] = cid
+            yield cid, chunk
+
+
+def load_chunks(source_dir: str = PDF_DIR, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP,
+                tag_companies: bool = True):
+    """
+    source_dir의 문서를 청크 목록으로 반환합니다.
+    """
+    return [chunk for _, chunk in iter_chunks(source_dir, chunk_size, chunk_overlap, tag_companies)]
+
+
+def build_vectorstore(name: str = "company", source_dir: str = PDF_DIR, tag_companies: bool = None,
+                      batch_size: int = EMBED_BATCH_SIZE, prune: bool = True, prune_legacy: bool = False):
+    """
+    벡터 DB를 source_dir의 문서와 증분 동기화합니다. 청크 해시를 id로 사용하므로 새로 추가되거나 바뀐 청크만
+    batch_size 단위로 임베딩하고, 더 이상 존재하지 않는 청크는 삭제합니다.
+
+    해시 id 도입 전에 만든 DB(UUID id)를 처음 동기화하면 기존 청크는 source_dir의 문서와 대응시킬 수 없으므로
+    삭제하지 않고 남겨 두며, source_dir의 문서는 해시 id로 새로 임베딩됩니다. source_dir에 원본 문서가 모두
+    있는지 확인한 뒤 prune_legacy=True(--prune-legacy)로 다시 실행하면 기존 청크를 삭제합니다.
+
+    Args:
+        name (str): 벡터 DB 이름("company", "battery") 또는 경로
+        source_dir (str): 문서 디렉토리 (.pdf, .txt, .md)
+        tag_companies (bool): 기업 메타데이터 태깅 여부 (기본값: company DB일 때만)
+        batch_size (int): 한 번에 임베딩할 청크 수
+        prune (bool): True면 source_dir에 없는 청크를 DB에서 삭제 (해시 id 청크만)
+        prune_legacy (bool): True면 해시 id가 아닌 기존 청크(UUID id)도 모두 삭제
+
+    Returns:
+        dict: 추가/삭제/유지된 청크 수, 남겨 둔 기존 청크 수, 소요 시간, 처리량(chunks/s)
+    """
+    if tag_companies is None:
+        tag_companies = name == "company"
+
+    vector_db = get_vector_store(name)
+    existing = set(vector_db.get(include=[])["ids"])
+
+    start = time.perf_counter()
+    current, batch, batch_ids = set(), [], []
+    added = embed_seconds = 0.0
+
+    def flush():
+        nonlocal added, embed_seconds
+        if not batch:
+            return
+        batch_start = time.perf_counter()
+        vector_db.add_documents(batch, ids=batch_ids)
+        embed_seconds += time.perf_counter() - batch_start
+        added += len(batch)
+        logging.info(f"Embedded {int(added)} new chunks ({len(batch) / (time.perf_counter() - batch_start):.1f} chunks/s)")
+        batch.clear()
+        batch_ids.clear()
+
+    for cid, chunk in iter_chunks(source_dir, tag_companies=tag_companies):
+        current.add(cid)
+        if cid in existing:
+            continue
+        batch.append(chunk)
+        batch_ids.append(cid)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    legacy = {cid for cid in existing if not HASH_ID_PATTERN.match(cid)}
+    stale = sorted(existing - legacy - current) if prune else []
+    if prune_legacy:
+        stale += sorted(legacy)
+    elif legacy:
+        logging.warning(
+            f"Vector store '{name}': kept {len(legacy)} chunks with pre-hash ids. Re-run with --prune-legacy once "
+            f"{source_dir} holds every source document to remove them."
+        )
+    for i in range(0, len(stale), batch_size):
+        vector_db.delete(ids=stale[i:i + batch_size])
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "added": int(added),
+        "deleted": len(stale),
+        "unchanged": len(current & existing),
+        "legacy_kept": 0 if prune_legacy else len(legacy),
+        "seconds": seconds,
+        "chunks_per_sec": added / embed_seconds if embed_seconds else None,
+    }
+    logging.info(f"Vector store '{name}' synced: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    # 사용법: python -m src.ingestion.build_vectorstore [company|battery] [문서 디렉토리] [--no-prune] [--prune-legacy]
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    store_name = args[0] if args else "company"
+    docs_dir = args[1] if len(args) > 1 else PDF_DIR
+    print(f"{store_name}: {build_vectorstore(store_name, docs_dir, prune='--no-prune' not in sys.argv, prune_legacy='--prune-legacy' in sys.argv)}")
@@ -0,0 +1,65 @@
+import re
+
+# ✅ 분석 대상 기업 메타데이터 (기업명 -> 티커, 본문에서 찾을 별칭)
+COMPANIES = {
+    "삼성 SDI": {"ticker": "006400.KS", "aliases": ["삼성 SDI", "삼성SDI", "Samsung SDI"]},
+    "LG에너지솔루션": {"ticker": "373220.KS", "aliases": ["LG에너지솔루션", "LG엔솔", "LG Energy Solution", "LGES"]},
+    "동원시스템즈": {"ticker": "014820.KS", "aliases": ["동원시스템즈", "Dongwon Systems"]},
+}
+
+
+def mention_key(ticker: str) -> str:
+    """
+    기업 언급 여부를 기록하는 메타데이터 키 (예: "mentions_006400_KS").
+    """
+    return "mentions_" + re.sub(r"[^0-9A-Za-z]", "_", ticker)
+
+
+def company_filter(company: str):
+    """
+    해당 기업을 언급한 청크만 조회하는 Chroma where 필터를 반환합니다. 등록되지 않은 기업이면 None을 반환합니다.
+    """
+    info = COMPANIES.get(company)
+    if info is None:
+        return None
+    return {mention_key(info["ticker"]): True}
+
+
+def normalize_date(value) -> str:
+    """
+    PDF 메타데이터 날짜("2025-03-05T08:34:22+09:00", "D:20250305083422+09'00'")를 YYYY-MM-DD로 변환합니다.
+    """
+    match = re.search(r"(\d{4})-?(\d{2})-?(\d{2})", str(value or ""))
+    return "-".join(match.groups()) if match else ""
+
+
+def tag_chunk(text: str, metadata: dict) -> dict:
+    """
+    청크 본문의 기업 언급을 찾아 company/ticker/date 메타데이터를 추가합니다.
+
+    Args:
+        text (str): 청크 본문
+        metadata (dict): 문서 로더가 만든 기존 메타데이터
+
+    Returns:
+        dict: 태그가 추가된 메타데이터
+            - company / ticker: 가장 많이 언급된 기업 (없으면 빈 문자열)
+            - companies: 언급된 기업명 목록 (쉼표 구분)
+            - mentions_<ticker>: 기업별 언급 여부 (where 필터용)
+            - date: 문서 날짜 (YYYY-MM-DD)
+    """
+    counts = {}
+    for company, info in COMPANIES.items():
+        count = sum(text.count(alias) for alias in info["aliases"])
+        if count:
+            counts[company] = count
+
+    primary = max(counts, key=counts.get) if counts else ""
+    tagged = dict(metadata)
+    tagged["company"] = primary
+    tagged["ticker"] = COMPANIES[primary]["ticker"] if primary else ""
+    tagged["companies"] = ",".join(counts)
+    for company, info in COMPANIES.items():
+        tagged[mention_key(info["ticker"])] = company in counts
+    tagged["date"] = normalize_date(metadata.get("creationdate") or metadata.get("moddate"))
+    return tagged
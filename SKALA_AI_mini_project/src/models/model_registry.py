@@ -0,0 +1,142 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import numpy as np
+import torch
+from sklearn.preprocessing import MinMaxScaler
+
+# ✅ 체크포인트 저장 경로
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "./models/registry")
+
+
+def hparams_key(hparams: dict) -> str:
+    """
+    하이퍼파라미터 dict를 짧은 해시 문자열로 변환합니다.
+    """
+    payload = json.dumps(hparams, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def date_array(index) -> np.ndarray:
+    """
+    날짜 인덱스를 int64(ns) 배열로 변환합니다.
+    """
+    return np.asarray(index, dtype="datetime64[ns]").astype(np.int64)
+
+
+def new_rows(checkpoint: dict, index) -> int:
+    """
+    현재 데이터에서 체크포인트의 마지막 학습 날짜 이후에 추가된 행 수.
+    """
+    return int((date_array(index) > int(checkpoint["dates"][-1])).sum())
+
+
+def scaler_to_dict(scaler: MinMaxScaler) -> dict:
+    return {name: getattr(scaler, name).tolist()
+            for name in ("min_", "scale_", "data_min_", "data_max_", "data_range_")}
+
+
+def scaler_from_dict(state: dict) -> MinMaxScaler:
+    scaler = MinMaxScaler()
+    for name, value in state.items():
+        setattr(scaler, name, np.asarray(value, dtype=np.float64))
+    scaler.n_features_in_ = len(state["min_"])
+    scaler.n_samples_seen_ = 1
+    return scaler
+
+
+class ModelRegistry:
+    """
+    티커 + 하이퍼파라미터 + 데이터 지문 기반의 로컬 모델 체크포인트 저장소.
+    state_dict와 학습된 MinMaxScaler를 함께 저장하고, 조회 시 재사용/파인튜닝/신규 학습 여부를 판단합니다.
+    """
+
+    def __init__(self, root: str = MODEL_REGISTRY_DIR):
+        self.root = root
+
+    def path(self, ticker: str, hparams: dict) -> str:
+        return os.path.join(self.root, ticker, f"{hparams_key(hparams)}.pt")
+
+    def lookup(self, ticker: str, hparams: dict, index, values: np.ndarray):
+        """
+        저장된 체크포인트와 현재 데이터를 날짜 기준으로 비교합니다. 데이터는 매일 앞쪽이 잘리고 뒤쪽이 늘어나는
+        이동 구간(예: 최근 1년)이므로 행 위치가 아니라 겹치는 날짜의 값이 같은지로 판단합니다.
+
+        Args:
+            ticker (str): 종목 티커
+            hparams (dict): 모델 하이퍼파라미터
+            index: 현재 데이터의 날짜 인덱스
+            values (np.ndarray): 현재 데이터의 입력 피처 값 [rows, n_features]
+
+        Returns:
+            tuple: ("reuse" | "fine_tune" | "train", 체크포인트 dict 또는 None)
+                - reuse: 겹치는 구간이 같고 저장 이후 새로운 날짜가 없음
+                - fine_tune: 겹치는 구간이 같고 저장된 마지막 날짜 뒤에 새로운 날짜가 추가됨
+                - train: 체크포인트가 없거나, 겹치는 날짜가 없거나, 겹치는 구간의 과거 데이터가 바뀜
+        """
+        path = self.path(ticker, hparams)
+        if not os.path.exists(path):
+            return "train", None
+        try:
+            checkpoint = torch.load(path, map_location="cpu", weights_only=True)
+        except Exception as e:
+            logging.warning(f"체크포인트를 불러오지 못했습니다 ({path}): {e}")
+            return "train", None
+        if "dates" not in checkpoint:
+            return "train", None  # 날짜를 기록하지 않은 이전 형식의 체크포인트
+
+        saved_dates = checkpoint["dates"].numpy()
+        saved_values = checkpoint["values"].numpy()
+        dates = date_array(index)
+        values = np.asarray(values, dtype=np.float64)
+        if len(dates) == 0 or dates[-1] < saved_dates[-1]:
+            return "train", None
+
+        # 두 데이터가 모두 포함하는 구간 [max(시작일), 저장된 마지막 날짜]의 날짜와 값이 같아야 함
+        overlap_start = max(dates[0], saved_dates[0])
+        current = (dates >= overlap_start) & (dates <= saved_dates[-1])
+        saved = saved_dates >= overlap_start
+        if not current.any() or not np.array_equal(dates[current], saved_dates[saved]) \
+                or not np.array_equal(values[current], saved_values[saved]):
+            return "train", None
+        if new_rows(checkpoint, index) == 0:
+            return "reuse", checkpoint
+        return "fine_tune", checkpoint
+
+    def save(self, ticker: str, hparams: dict, model, scaler: MinMaxScaler, index, values: np.ndarray):
+        """
+        모델 가중치와 scaler, 학습에 사용한 날짜/입력 값을 저장합니다. 임시 파일에 쓴 뒤 교체합니다.
+        """
+        path = self.path(ticker, hparams)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        checkpoint = {
+            "state_dict": model.state_dict(),
+            "scaler": scaler_to_dict(scaler),
+            "hparams": json.dumps(hparams, sort_keys=True, default=str),
+            "dates": torch.from_numpy(date_array(index).copy()),
+            "values": torch.from_numpy(np.array(values, dtype=np.float64)),
+        }
+        # 같은 티커를 여러 작업이 동시에 저장할 수 있으므로 호출마다 고유한 임시 파일에 쓴 뒤 원자적으로 교체
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as tmp:
+            try:
+                torch.save(checkpoint, tmp)
+            except Exception:
+                tmp.close()
+                os.remove(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+        return path
+
+
+_default_registry = None
+
+def get_model_registry() -> ModelRegistry:
+    """
+    기본 설정의 전역 ModelRegistry를 반환합니다.
+    """
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry()
+    return _default_registry
@@ -1,88 +1,414 @@
+import os
+import time
+import logging
 import torch
 import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 
+from src.models.model_registry import get_model_registry, new_rows, scaler_from_dict
+
 # Transformer 모델 정의
 class TransformerModel(nn.Module):
-    def __init__(self, input_dim, model_dim=64, num_heads=4, num_layers=2):
+    def __init__(self, input_dim, model_dim=64, num_heads=4, num_layers=2, output_dim=1, num_tickers=0):
         super().__init__()
         self.embedding = nn.Linear(input_dim, model_dim)
+        # num_tickers > 0이면 여러 티커를 함께 학습하는 글로벌 모델용 티커 임베딩을 입력에 더함
+        self.ticker_embedding = nn.Embedding(num_tickers, model_dim) if num_tickers else None
         encoder_layer = nn.TransformerEncoderLayer(d_model=model_dim, nhead=num_heads, batch_first=True)
         self.transformer = nn.TransformerEncoder(encoder_layer, num_layers=num_layers)
-        self.decoder = nn.Linear(model_dim, 1)
+        # output_dim > 1이면 마지막 time step에서 여러 시점을 한 번에 예측하는 direct multi-horizon head
+        self.decoder = nn.Linear(model_dim, output_dim)
 
-    def forward(self, src):
+    def forward(self, src, ticker_ids=None):
         embedded = self.embedding(src)
+        if self.ticker_embedding is not None and ticker_ids is not None:
+            embedded = embedded + self.ticker_embedding(ticker_ids).unsqueeze(1)
         output = self.transformer(embedded)
         return self.decoder(output)
 
+# ✅ 기본 입력 피처, 예측 대상 및 예측 기간
+DEFAULT_FEATURES = ("Close",)
+DEFAULT_HORIZON = 30
+OHLCV_FEATURES = ("Open", "High", "Low", "Close", "Volume")
+
 # 데이터 전처리 및 학습 데이터 구성
-def prepare_data(df: pd.DataFrame, window_size: int = 30):
-    if "Close" not in df.columns:
-        raise ValueError(f"데이터프레임에 'Close' 컬럼이 없습니다. 현재 컬럼: {df.columns.tolist()}")
-    prices = df["Close"].values.reshape(-1, 1)
-    scaler = MinMaxScaler()
-    scaled = scaler.fit_transform(prices)
-
-    x, y = [], []
-    for i in range(len(scaled) - window_size):
-        x.append(scaled[i:i+window_size])
-        y.append(scaled[i+window_size])
-
-    x = torch.tensor(x, dtype=torch.float32)  # shape: [samples, window_size, 1]
-    y = torch.tensor(y, dtype=torch.float32)  # shape: [samples, 1]
+def prepare_data(df: pd.DataFrame, window_size: int = 30, features=DEFAULT_FEATURES, target: str = "Close",
+                 scaler: MinMaxScaler = None, horizon: int = 1):
+    """
+    슬라이딩 윈도우 학습 데이터를 구성합니다. 윈도우는 Tensor.unfold로 만든 view이므로 복사가 발생하지 않습니다.
+
+    Args:
+        df (pd.DataFrame): 주가 데이터프레임
+        window_size (int): 슬라이딩 윈도우 크기
+        features (tuple): 입력 피처 컬럼 (예: OHLCV_FEATURES)
+        target (str): 예측 대상 컬럼 (features에 포함되어야 함)
+        scaler (MinMaxScaler): 이미 학습된 scaler (주어지면 다시 학습하지 않고 변환만 수행)
+        horizon (int): 타깃 시점 수 (1이면 다음 시점, 그 이상이면 direct multi-horizon 학습용)
+
+    Returns:
+        tuple: x [samples, window_size, n_features], y [samples, horizon], 피처별로 학습된 scaler
+    """
+    features = list(features)
+    missing = [c for c in features if c not in df.columns]
+    if missing:
+        raise ValueError(f"데이터프레임에 {missing} 컬럼이 없습니다. 현재 컬럼: {df.columns.tolist()}")
+    if target not in features:
+        raise ValueError(f"예측 대상 '{target}'이 입력 피처 {features}에 없습니다.")
+    if len(df) < window_size + horizon:
+        raise ValueError(f"데이터 길이({len(df)})가 윈도우 크기 + 예측 기간({window_size + horizon})보다 짧습니다.")
+
+    values = df[features].to_numpy(dtype=np.float32).reshape(len(df), len(features))
+    if scaler is None:
+        scaler = MinMaxScaler()
+        scaled = scaler.fit_transform(values)
+    else:
+        scaled = scaler.transform(values)
+    scaled = torch.from_numpy(np.ascontiguousarray(scaled, dtype=np.float32))
+
+    target_idx = features.index(target)
+    x = scaled[:len(scaled) - horizon].unfold(0, window_size, 1).transpose(1, 2)  # shape: [samples, window_size, n_features]
+    y = scaled[window_size:, target_idx].unfold(0, horizon, 1)                     # shape: [samples, horizon]
     return x, y, scaler
 
-# 예측 함수 (미래 30일)
-def predict_future(model, last_sequence, steps=30):
+def latest_window(df: pd.DataFrame, scaler: MinMaxScaler, window_size: int = 30, features=DEFAULT_FEATURES):
+    """
+    예측 입력으로 사용할 가장 최근 window_size 구간을 스케일링해 반환합니다. shape: [window_size, n_features]
+    """
+    values = df[list(features)].to_numpy(dtype=np.float32)[-window_size:].reshape(window_size, len(features))
+    return torch.from_numpy(np.ascontiguousarray(scaler.transform(values), dtype=np.float32))
+
+def inverse_target(scaler: MinMaxScaler, values, target_idx: int = 0):
+    """
+    예측 대상 컬럼의 스케일만 원래 값으로 되돌립니다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return values * scaler.data_range_[target_idx] + scaler.data_min_[target_idx]
+
+# 예측 함수 (자기회귀, 여러 시퀀스를 한 번에 처리)
+def predict_future(model, last_sequence, steps: int = DEFAULT_HORIZON, target_idx: int = 0, ticker_ids=None):
+    """
+    자기회귀 방식으로 미래 steps 시점을 예측합니다. 윈도우를 이어 붙이는 대신 [batch, window_size + steps]
+    크기의 버퍼를 미리 할당해 슬라이딩하며, 결과는 마지막에 한 번만 CPU/NumPy로 옮깁니다.
+
+    Args:
+        model (nn.Module): 학습된 모델
+        last_sequence (torch.Tensor): [window_size, n_features] 또는 같은 모델로 예측할 [batch, window_size, n_features]
+        steps (int): 예측 기간
+        target_idx (int): 예측 대상 피처 위치 (대상 외 피처는 마지막 값을 유지)
+        ticker_ids (torch.Tensor): 글로벌 모델의 시퀀스별 티커 id [batch] (선택)
+
+    Returns:
+        np.ndarray: 스케일된 예측값 [steps] 또는 [batch, steps]
+    """
+    model.eval()
+    single = last_sequence.dim() == 2
+    seqs = last_sequence.unsqueeze(0) if single else last_sequence
+    batch, window_size, n_features = seqs.shape
+
+    with torch.inference_mode():
+        buffer = torch.empty(batch, window_size + steps, n_features, dtype=seqs.dtype)
+        buffer[:, :window_size] = seqs
+        preds = torch.empty(batch, steps, dtype=seqs.dtype)
+        for t in range(steps):
+            pred = model(buffer[:, t:t + window_size], ticker_ids)[:, -1, 0]  # 마지막 time step 예측값
+            preds[:, t] = pred
+            buffer[:, window_size + t] = buffer[:, window_size + t - 1]
+            buffer[:, window_size + t, target_idx] = pred
+
+    preds = preds.numpy()
+    return preds[0] if single else preds
+
+# 예측 함수 (direct multi-horizon head, 한 번의 forward로 전체 기간 예측)
+def predict_direct(model, last_sequence, ticker_ids=None):
+    """
+    output_dim=horizon으로 학습된 모델로 전체 예측 기간을 한 번에 예측합니다.
+
+    Returns:
+        np.ndarray: 스케일된 예측값 [horizon] 또는 [batch, horizon]
+    """
     model.eval()
-    preds = []
-    seq = last_sequence.clone().detach()  # shape: [window_size, 1]
-    for _ in range(steps):
-        with torch.no_grad():
-            inp = seq.unsqueeze(0)  # [1, window_size, 1]
-            out = model(inp)  # [1, window_size, 1]
-            pred = out[:, -1, 0]  # 마지막 time step 예측값
-            preds.append(pred.item())
-            # 슬라이딩 윈도우 업데이트
-            seq = torch.cat([seq[1:], pred.unsqueeze(-1)], dim=0)
-    return preds
+    single = last_sequence.dim() == 2
+    seqs = last_sequence.unsqueeze(0) if single else last_sequence
+    with torch.inference_mode():
+        preds = model(seqs, ticker_ids)[:, -1, :].numpy()
+    return preds[0] if single else preds
+
+def forecast_sequences(model, sequences, horizon: int = DEFAULT_HORIZON, direct: bool = False, target_idx: int = 0,
+                       ticker_ids=None):
+    """
+    여러 티커의 마지막 윈도우 [batch, window_size, n_features]를 하나의 배치 텐서로 예측합니다.
+    같은 모델을 공유하는 티커들을 한 번의 배치 작업으로 처리할 때 사용합니다.
+
+    Returns:
+        np.ndarray: 스케일된 예측값 [batch, horizon]
+    """
+    if direct:
+        return predict_direct(model, sequences, ticker_ids)[:, :horizon]
+    return predict_future(model, sequences, steps=horizon, target_idx=target_idx, ticker_ids=ticker_ids)
+
+# ✅ 학습 설정 기본값
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_VAL_SPLIT = 0.1
+DEFAULT_PATIENCE = 3
+FINE_TUNE_EPOCHS = 2
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))  # 0이면 PyTorch 기본값 사용
+
+# 학습 엔진: 미니배치 학습 + 검증 기반 조기 종료
+def train_model(model, x, y, epochs: int = 5, batch_size: int = DEFAULT_BATCH_SIZE, lr: float = 1e-3,
+                val_split: float = DEFAULT_VAL_SPLIT, patience: int = DEFAULT_PATIENCE,
+                num_threads: int = TORCH_NUM_THREADS, compile_model: bool = False, ticker_ids=None):
+    """
+    셔플된 미니배치로 모델을 학습합니다. 시계열 누수를 막기 위해 마지막 val_split 구간을 검증용으로 떼어두고,
+    검증 손실이 patience 에폭 동안 개선되지 않으면 학습을 멈추고 최적 가중치로 복원합니다.
+
+    Args:
+        model (nn.Module): 학습할 모델
+        x (torch.Tensor): 입력 윈도우 [samples, window_size, n_features]
+        y (torch.Tensor): 타깃 [samples, horizon] (모델 출력의 마지막 time step과 비교)
+        epochs (int): 최대 학습 에폭 수
+        batch_size (int): 미니배치 크기
+        lr (float): 학습률
+        val_split (float): 검증용으로 사용할 마지막 구간 비율 (0이면 검증 없음)
+        patience (int): 조기 종료 전 허용할 미개선 에폭 수
+        num_threads (int): torch.set_num_threads 값 (0이면 변경하지 않음)
+        compile_model (bool): True면 torch.compile로 학습 단계를 컴파일
+        ticker_ids (torch.Tensor): 글로벌 모델 학습 시 샘플별 티커 id [samples] (선택)
+
+    Returns:
+        dict: 에폭별 손실/소요 시간/처리량과 최적 에폭 정보
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    n_val = int(len(x) * val_split) if val_split else 0
+    train_x, train_y = x[:len(x) - n_val], y[:len(y) - n_val]
+    val_x, val_y = x[len(x) - n_val:], y[len(y) - n_val:]
+    if ticker_ids is None:
+        loader = DataLoader(TensorDataset(train_x, train_y), batch_size=batch_size, shuffle=True)
+        val_ids = None
+    else:
+        loader = DataLoader(TensorDataset(train_x, train_y, ticker_ids[:len(x) - n_val]), batch_size=batch_size, shuffle=True)
+        val_ids = ticker_ids[len(x) - n_val:]
+
+    step_model = torch.compile(model) if compile_model else model
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    criterion = nn.MSELoss()
+
+    history = []
+    best_loss, best_epoch, best_state = float("inf"), 0, None
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        model.train()
+        total_loss = 0.0
+        for batch_x, batch_y, *batch_ids in loader:
+            output = step_model(batch_x, *batch_ids)
+            loss = criterion(output[:, -1, :], batch_y)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(batch_x)
+        train_loss = total_loss / max(len(train_x), 1)
+
+        val_loss = None
+        if n_val:
+            model.eval()
+            with torch.inference_mode():
+                val_loss = criterion(step_model(val_x, val_ids)[:, -1, :], val_y).item()
+
+        seconds = time.perf_counter() - start
+        history.append({
+            "epoch": epoch + 1,
+            "train_loss": train_loss,
+            "val_loss": val_loss,
+            "seconds": seconds,
+            "samples_per_sec": len(train_x) / seconds if seconds else None,
+        })
+
+        # 조기 종료 (검증 데이터가 없으면 학습 손실 기준)
+        monitored = train_loss if val_loss is None else val_loss
+        if monitored < best_loss:
+            best_loss, best_epoch = monitored, epoch + 1
+            best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+        elif epoch + 1 - best_epoch >= patience:
+            break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+
+    return {
+        "epochs": history,
+        "best_epoch": best_epoch,
+        "best_loss": best_loss,
+        "stopped_early": len(history) < epochs,
+        "train_samples": len(train_x),
+        "val_samples": n_val,
+        "total_seconds": sum(h["seconds"] for h in history),
+    }
+
+# 체크포인트 재사용 / 파인튜닝 / 신규 학습
+def _forecast_model_from_registry(df, ticker, registry, window_size, epochs, features, target, output_dim, train_kwargs):
+    features = list(features)
+    hparams = {
+        "window_size": window_size,
+        "features": features,
+        "target": target,
+        "model_dim": 64,
+        "num_heads": 4,
+        "num_layers": 2,
+        "output_dim": output_dim,
+    }
+    values = df[features].to_numpy(dtype=np.float64).reshape(len(df), len(features))
+    status, checkpoint = registry.lookup(ticker, hparams, df.index, values)
+
+    scaler = scaler_from_dict(checkpoint["scaler"]) if checkpoint else None
+    x, y, scaler = prepare_data(df, window_size, features=features, target=target, scaler=scaler, horizon=output_dim)
+    model = TransformerModel(input_dim=len(features), output_dim=output_dim)
+
+    if status == "reuse":
+        model.load_state_dict(checkpoint["state_dict"])
+        metrics = {"epochs": [], "total_seconds": 0.0}
+    elif status == "fine_tune":
+        # 새로 추가된 날짜가 포함된 최근 윈도우만 짧게 이어서 학습 (최소 한 배치 분량)
+        model.load_state_dict(checkpoint["state_dict"])
+        n_new = max(new_rows(checkpoint, df.index), DEFAULT_BATCH_SIZE)
+        fine_tune_kwargs = {**train_kwargs, "val_split": 0}
+        metrics = train_model(model, x[-n_new:], y[-n_new:], epochs=FINE_TUNE_EPOCHS, **fine_tune_kwargs)
+    else:
+        metrics = train_model(model, x, y, epochs=epochs, **train_kwargs)
+
+    if status != "reuse":
+        registry.save(ticker, hparams, model, scaler, df.index, values)
+    logging.info(f"Model registry [{ticker}]: {status}")
+    metrics["mode"] = status
+    return model, scaler, metrics
 
 # 전체 파이프라인: 모델 학습 및 예측
-def transformer_forecast(df: pd.DataFrame, window_size: int = 30, epochs: int = 5):
+def transformer_forecast(df: pd.DataFrame, window_size: int = 30, epochs: int = 5,
+                         features=DEFAULT_FEATURES, target: str = "Close",
+                         return_metrics: bool = False, ticker: str = None, registry=None,
+                         horizon: int = DEFAULT_HORIZON, direct: bool = False, **train_kwargs):
     """
     Transformer 모델을 사용하여 주가를 예측합니다.
 
     Args:
         df (pd.DataFrame): 주가 데이터프레임
         window_size (int): 슬라이딩 윈도우 크기
-        epochs (int): 학습 에폭 수
+        epochs (int): 최대 학습 에폭 수
+        features (tuple): 입력 피처 컬럼
+        target (str): 예측 대상 컬럼
+        return_metrics (bool): True면 (예측값, 학습 지표) 튜플을 반환
+        ticker (str): 종목 티커. 주어지면 모델 레지스트리에서 체크포인트를 재사용하거나 이어서 학습합니다.
+        registry (ModelRegistry): 사용할 모델 레지스트리 (기본값: 전역 레지스트리)
+        horizon (int): 예측 기간 (일)
+        direct (bool): True면 horizon 시점을 한 번에 출력하는 direct multi-horizon head로 학습/예측
+        **train_kwargs: train_model에 전달할 학습 설정 (batch_size, val_split, patience, num_threads 등)
 
     Returns:
-        np.ndarray: 예측된 주가 배열
+        np.ndarray: 예측된 주가 배열 (return_metrics=True면 (예측값, 학습 지표 dict))
     """
-    x, y, scaler = prepare_data(df, window_size)
-    model = TransformerModel(input_dim=1)
+    target_idx = list(features).index(target)
+    output_dim = horizon if direct else 1
+    if ticker is None:
+        x, y, scaler = prepare_data(df, window_size, features=features, target=target, horizon=output_dim)
+        model = TransformerModel(input_dim=x.shape[-1], output_dim=output_dim)
+        metrics = train_model(model, x, y, epochs=epochs, **train_kwargs)
+        metrics["mode"] = "train"
+    else:
+        model, scaler, metrics = _forecast_model_from_registry(
+            df, ticker, registry or get_model_registry(), window_size, epochs, features, target, output_dim, train_kwargs
+        )
 
-    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
-    criterion = nn.MSELoss()
+    # 예측 수행 (가장 최근 window_size 구간을 입력으로 사용)
+    last_sequence = latest_window(df, scaler, window_size, features)  # [window_size, n_features]
+    predictions = forecast_sequences(model, last_sequence.unsqueeze(0), horizon, direct, target_idx)[0]
+    predicted_prices = inverse_target(scaler, predictions, target_idx)
+    if return_metrics:
+        return predicted_prices, metrics
+    return predicted_prices  # shape: (horizon,)
 
-    for epoch in range(epochs):
-        model.train()
-        output = model(x)
-        loss = criterion(output[:, -1, 0], y[:, 0])
-        optimizer.zero_grad()
-        loss.backward()
-        optimizer.step()
-
-        # 학습 상태 출력
-        print(f"Epoch {epoch + 1}/{epochs}, Loss: {loss.item()}")
-
-    # 예측 수행
-    last_sequence = x[-1]  # [window_size, 1]
-    predictions = predict_future(model, last_sequence)
-    predictions = np.array(predictions).reshape(-1, 1)
-    predicted_prices = scaler.inverse_transform(predictions).flatten()
-    return predicted_prices  # shape: (30,)
\ No newline at end of file
+
+# 글로벌 모델: 여러 티커의 윈도우를 하나의 패널로 묶어 한 번 학습하고 한 번의 배치로 예측
+def build_panel(frames: dict, window_size: int = 30, features=DEFAULT_FEATURES, target: str = "Close",
+                horizon: int = 1):
+    """
+    티커별로 스케일링한 윈도우를 하나의 패널 텐서로 쌓습니다. 스케일은 티커마다 따로 학습하고, 샘플은 윈도우의
+    마지막 날짜 순으로 정렬해 train_model의 마지막 val_split 구간이 모든 티커의 최근 구간이 되도록 합니다.
+
+    Args:
+        frames (dict): 기업명 -> 주가 데이터프레임
+        window_size (int): 슬라이딩 윈도우 크기
+        features (tuple): 입력 피처 컬럼
+        target (str): 예측 대상 컬럼
+        horizon (int): 타깃 시점 수
+
+    Returns:
+        tuple: x [samples, window_size, n_features], y [samples, horizon], ticker_ids [samples],
+            기업명 -> scaler, 기업명 -> 오류 메시지 (패널에서 제외된 기업)
+    """
+    xs, ys, ids, end_dates = [], [], [], []
+    scalers, errors = {}, {}
+    for company, df in frames.items():
+        try:
+            x, y, scaler = prepare_data(df, window_size, features=features, target=target, horizon=horizon)
+        except ValueError as e:
+            logging.error(f"Error preparing {company} for global model: {str(e)}")
+            errors[company] = str(e)
+            continue
+        ticker_id = len(scalers)
+        scalers[company] = scaler
+        xs.append(x)
+        ys.append(y)
+        ids.append(torch.full((len(x),), ticker_id, dtype=torch.long))
+        end_dates.append(df.index[window_size - 1:window_size - 1 + len(x)].values)
+    if not xs:
+        return None, None, None, scalers, errors
+
+    order = torch.from_numpy(np.argsort(np.concatenate(end_dates), kind="stable"))
+    return torch.cat(xs)[order], torch.cat(ys)[order], torch.cat(ids)[order], scalers, errors
+
+def global_forecast(frames: dict, window_size: int = 30, epochs: int = 5, features=DEFAULT_FEATURES,
+                    target: str = "Close", horizon: int = DEFAULT_HORIZON, direct: bool = False,
+                    ticker_embedding: bool = True, **train_kwargs):
+    """
+    watchlist 전체를 하나의 Transformer로 학습해 예측합니다. 티커별 모델 생성/학습 고정 비용이 없으므로 학습 비용은
+    티커 수가 아니라 전체 윈도우 수에 비례하고, 예측도 모든 티커의 마지막 윈도우를 한 번의 배치로 수행합니다.
+
+    Args:
+        frames (dict): 기업명 -> 주가 데이터프레임
+        window_size (int): 슬라이딩 윈도우 크기
+        epochs (int): 최대 학습 에폭 수
+        features (tuple): 입력 피처 컬럼
+        target (str): 예측 대상 컬럼
+        horizon (int): 예측 기간 (일)
+        direct (bool): True면 direct multi-horizon head로 학습/예측
+        ticker_embedding (bool): True면 티커 임베딩으로 종목별 특성을 구분
+        **train_kwargs: train_model에 전달할 학습 설정
+
+    Returns:
+        dict: 기업명 -> (예측값, 학습 지표) 또는 {"error": ...} (forecast_in_process_pool과 같은 형식)
+    """
+    target_idx = list(features).index(target)
+    output_dim = horizon if direct else 1
+    x, y, ticker_ids, scalers, errors = build_panel(frames, window_size, features, target, output_dim)
+    results = {company: {"error": message} for company, message in errors.items()}
+    if x is None:
+        return results
+
+    companies = list(scalers)
+    model = TransformerModel(input_dim=x.shape[-1], output_dim=output_dim,
+                             num_tickers=len(companies) if ticker_embedding else 0)
+    metrics = train_model(model, x, y, epochs=epochs, ticker_ids=ticker_ids if ticker_embedding else None,
+                          **train_kwargs)
+    metrics["mode"] = "global"
+    metrics["tickers"] = len(companies)
+    logging.info(f"Global model trained on {len(companies)} tickers, {len(x)} windows in {metrics['total_seconds']:.2f}s")
+
+    sequences = torch.stack([latest_window(frames[c], scalers[c], window_size, features) for c in companies])
+    ids = torch.arange(len(companies)) if ticker_embedding else None
+    predictions = forecast_sequences(model, sequences, horizon, direct, target_idx, ticker_ids=ids)
+    for i, company in enumerate(companies):
+        results[company] = (inverse_target(scalers[company], predictions[i], target_idx), metrics)
+    return {company: results[company] for company in frames}
@@ -0,0 +1,80 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# ✅ 티커별 모델 학습 프로세스 수 (0이면 CPU 코어 수 기준으로 자동 결정, 1이면 현재 프로세스에서 순차 실행)
+TRAINING_PROCESSES = int(os.getenv("TRAINING_PROCESSES", "0"))
+
+
+def threads_per_worker(workers: int) -> int:
+    """
+    워커 수에 맞춰 프로세스당 PyTorch 스레드 수를 나눕니다 (코어 과다 할당 방지).
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_worker(num_threads: int):
+    import torch
+
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+
+def _train_and_forecast(ticker, df, forecast_kwargs):
+    from src.models.stock_predictor_model import transformer_forecast
+
+    return transformer_forecast(df, ticker=ticker, return_metrics=True, **forecast_kwargs)
+
+
+def forecast_in_process_pool(jobs: dict, max_workers: int = None, **forecast_kwargs):
+    """
+    티커별 모델 학습과 예측을 ProcessPoolExecutor에서 병렬로 실행합니다.
+    작은 모델은 한 모델의 intra-op 스레드를 늘리는 것보다 여러 모델을 동시에 학습하는 편이 훨씬 잘 확장됩니다.
+
+    Args:
+        jobs (dict): 기업명 -> (티커, 주가 데이터프레임)
+        max_workers (int): 최대 프로세스 수 (기본값: TRAINING_PROCESSES 환경 변수, 0이면 CPU 코어 수)
+        **forecast_kwargs: transformer_forecast에 전달할 설정
+
+    Returns:
+        dict: 기업명 -> (예측값, 학습 지표) 또는 {"error": ...}
+    """
+    if not jobs:
+        return {}
+    workers = max_workers if max_workers is not None else TRAINING_PROCESSES
+    workers = max(1, min(workers or (os.cpu_count() or 1), len(jobs)))
+
+    results = {}
+    if workers == 1:
+        for company, (ticker, df) in jobs.items():
+            try:
+                results[company] = _train_and_forecast(ticker, df, forecast_kwargs)
+            except Exception as e:
+                logging.error(f"Error forecasting {company}: {str(e)}")
+                results[company] = {"error": str(e)}
+        return results
+
+    num_threads = threads_per_worker(workers)
+    logging.info(f"Training {len(jobs)} models on {workers} processes x {num_threads} threads")
+    # fork 이후 OpenMP 스레드 풀이 멈추는 문제를 피하기 위해 spawn 사용
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(num_threads,),
+    ) as executor:
+        futures = {
+            company: executor.submit(_train_and_forecast, ticker, df, forecast_kwargs)
+            for company, (ticker, df) in jobs.items()
+        }
+        for company, future in futures.items():
+            try:
+                results[company] = future.result()
+            except Exception as e:
+                logging.error(f"Error forecasting {company}: {str(e)}")
+                results[company] = {"error": str(e)}
+    return results
@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# ✅ 그래프 체크포인트 DB (LangGraph 체크포인트와 기업 단위 작업 결과를 같은 파일에 저장)
+GRAPH_CHECKPOINT_PATH = os.getenv("GRAPH_CHECKPOINT_PATH", "./cache/graph_checkpoints.sqlite3")
+# 실행 id가 날짜마다 바뀌므로 오래된 실행의 체크포인트는 정리 (0이면 해당 기준으로 정리하지 않음)
+GRAPH_CHECKPOINT_RETENTION_DAYS = float(os.getenv("GRAPH_CHECKPOINT_RETENTION_DAYS", "7"))  # 마지막 사용 후 보관 일수
+GRAPH_CHECKPOINT_MAX_RUNS = int(os.getenv("GRAPH_CHECKPOINT_MAX_RUNS", "50"))  # 최근 사용 순으로 보관할 최대 실행 수
+
+# 노드 단위 결과를 기업 단위 결과 테이블에 저장할 때 쓰는 단계 이름 (company 열에는 노드 입력 해시를 저장)
+NODE_STEP = "__node__"
+
+# 현재 실행(run id). 설정된 동안 run_per_company의 기업별 결과와 노드 결과가 저장/재사용됨
+_current_run = contextvars.ContextVar("checkpoint_run", default=None)
+
+
+def input_fingerprint(initial_state: dict, **extra) -> str:
+    """
+    실행 입력(run_config, 실행 모드, 날짜 등)의 해시. 입력이 바뀌면 기존 체크포인트를 재사용하지 않습니다.
+    """
+    run_config = {k: v for k, v in (initial_state.get("run_config") or {}).items() if k != "input_hash"}
+    payload = json.dumps({"run_config": run_config, **extra}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def state_fingerprint(state: dict) -> str:
+    """
+    노드 입력 state의 해시. numpy 배열은 값 목록으로, 그 밖의 JSON으로 바꿀 수 없는 값은 문자열로 변환합니다.
+    """
+    payload = json.dumps(
+        state, sort_keys=True, ensure_ascii=False,
+        default=lambda value: value.tolist() if hasattr(value, "tolist") else str(value),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def has_error(value) -> bool:
+    """
+    노드 결과에 오류가 포함되어 있는지 확인합니다. ({"error": ...} 또는 기업별 {"error": ...})
+    """
+    if not isinstance(value, dict):
+        return False
+    return "error" in value or any(isinstance(v, dict) and "error" in v for v in value.values())
+
+
+class UnitStore:
+    """
+    노드 안의 기업 단위 작업 결과를 (run id, 노드, 단계, 기업)별로 보관하는 SQLite 저장소. 성공한 결과만 저장하므로
+    재실행 시 실패한 기업만 다시 계산합니다. 실행별 마지막 사용 시각도 함께 기록해 오래된 실행을 정리하는 데 사용합니다.
+    """
+
+    def __init__(self, path: str = GRAPH_CHECKPOINT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS company_units ("
+                "run_id TEXT, node TEXT, step TEXT, company TEXT, value BLOB, created_at REAL, "
+                "PRIMARY KEY (run_id, node, step, company))"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, last_used REAL)")
+
+    def get(self, run_id: str, node: str, step: str, company: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM company_units WHERE run_id = ? AND node = ? AND step = ? AND company = ?",
+                (run_id, node or "", step, company),
+            ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, run_id: str, node: str, step: str, company: str, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO company_units VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, node or "", step, company, blob, time.time()),
+            )
+
+    def clear_run(self, run_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM company_units WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    def touch_run(self, run_id: str):
+        """
+        실행의 마지막 사용 시각을 현재 시각으로 갱신합니다.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?)", (run_id, time.time()))
+
+    def list_runs(self, known_run_ids=()) -> list:
+        """
+        실행 id와 마지막 사용 시각을 최근 사용 순으로 반환합니다. 사용 시각이 기록되지 않은 실행(known_run_ids 또는
+        기업 단위 결과에만 있는 실행)은 지금 사용한 것으로 등록해 보관 기간이 지난 뒤 정리되도록 합니다.
+
+        Returns:
+            list: [(run_id, last_used)]
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO runs VALUES (?, ?)", [(run_id, now) for run_id in known_run_ids])
+            self._conn.execute("INSERT OR IGNORE INTO runs SELECT DISTINCT run_id, ? FROM company_units", (now,))
+            return self._conn.execute("SELECT run_id, last_used FROM runs ORDER BY last_used DESC").fetchall()
+
+
+_unit_store = None
+_checkpointer = None
+_store_lock = threading.Lock()
+
+def get_unit_store() -> UnitStore:
+    global _unit_store
+    with _store_lock:
+        if _unit_store is None:
+            _unit_store = UnitStore()
+        return _unit_store
+
+
+def get_checkpointer():
+    """
+    LangGraph SQLite 체크포인터를 반환합니다. (langgraph-checkpoint-sqlite 필요, 최초 사용 시 로드)
+    """
+    global _checkpointer
+    with _store_lock:
+        if _checkpointer is None:
+            from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+            from langgraph.checkpoint.sqlite import SqliteSaver
+
+            os.makedirs(os.path.dirname(os.path.abspath(GRAPH_CHECKPOINT_PATH)), exist_ok=True)
+            # forecast_data의 datetime64 배열은 msgpack으로 직렬화되지 않으므로 pickle로 저장 (로컬 파일 전용)
+            _checkpointer = SqliteSaver(
+                sqlite3.connect(GRAPH_CHECKPOINT_PATH, check_same_thread=False),
+                serde=JsonPlusSerializer(pickle_fallback=True),
+            )
+        return _checkpointer
+
+
+def current_run_id():
+    return _current_run.get()
+
+
+@contextmanager
+def run_scope(run_id: str):
+    """
+    블록 안에서 실행되는 기업 단위 작업을 run_id로 체크포인트합니다.
+    """
+    token = _current_run.set(run_id)
+    try:
+        yield
+    finally:
+        _current_run.reset(token)
+
+
+def checkpoint_node(name: str, fn, inputs=None):
+    """
+    그래프 노드 함수를 감싸 체크포인트 실행(run_scope) 중 오류 없이 끝난 노드 결과를 입력 state 해시별로 저장합니다.
+    실패한 노드를 다시 실행하려고 이전 체크포인트에서 재개할 때, 같은 입력으로 이미 성공한 형제 노드는 다시
+    계산하지 않고 저장된 결과를 반환합니다. (입력이 바뀐 하위 노드는 다시 실행)
+
+    Args:
+        name (str): 노드 이름
+        fn (Callable): 노드 함수
+        inputs (tuple): 노드가 읽는 state 키 (기본값: state 전체). 다른 노드의 결과가 바뀌어도 읽지 않는 키면 재사용
+    """
+    @functools.wraps(fn)
+    def wrapper(state):
+        run_id = current_run_id()
+        if run_id is None:
+            return fn(state)
+
+        key = state_fingerprint({k: state.get(k) for k in inputs} if inputs is not None else state)
+        cached = get_unit_store().get(run_id, name, NODE_STEP, key)
+        if cached is not None:
+            logging.info(f"Checkpoint hit for node {name}")
+            return cached
+        update = fn(state)
+        if not any(has_error(value) for value in (update or {}).values()):
+            get_unit_store().put(run_id, name, NODE_STEP, key, update)
+        return update
+
+    return wrapper
+
+
+def invalidate_run(run_id: str):
+    """
+    run_id의 그래프 체크포인트와 기업 단위 결과를 모두 삭제합니다.
+    """
+    get_checkpointer().delete_thread(run_id)
+    get_unit_store().clear_run(run_id)
+    logging.info(f"Checkpoints invalidated for run {run_id}")
+
+
+def prune_runs(keep: str = None, max_age_days: float = None, max_runs: int = None) -> list:
+    """
+    마지막 사용 후 max_age_days가 지났거나 최근 사용 순으로 max_runs개를 넘는 실행의 체크포인트를 삭제합니다.
+
+    Args:
+        keep (str): 정리 대상에서 제외할 실행 id (현재 실행)
+        max_age_days (float): 보관 일수 (기본값: GRAPH_CHECKPOINT_RETENTION_DAYS 환경 변수, 0이면 제한 없음)
+        max_runs (int): 보관할 최대 실행 수 (기본값: GRAPH_CHECKPOINT_MAX_RUNS 환경 변수, 0이면 제한 없음)
+
+    Returns:
+        list: 삭제한 실행 id 리스트
+    """
+    max_age_days = GRAPH_CHECKPOINT_RETENTION_DAYS if max_age_days is None else max_age_days
+    max_runs = GRAPH_CHECKPOINT_MAX_RUNS if max_runs is None else max_runs
+    if not max_age_days and not max_runs:
+        return []
+
+    # 그래프 체크포인트의 thread id (= 실행 id). 공개 API(list)는 모든 체크포인트를 역직렬화하므로 테이블을 직접 조회
+    with get_checkpointer().cursor(transaction=False) as cur:
+        thread_ids = [row[0] for row in cur.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+    runs = [run for run in get_unit_store().list_runs(thread_ids) if run[0] != keep]
+
+    cutoff = time.time() - max_age_days * 86400
+    stale = [
+        run_id for i, (run_id, last_used) in enumerate(runs)
+        if (max_age_days and last_used < cutoff) or (max_runs and i >= max_runs - (keep is not None))
+    ]
+    for run_id in stale:
+        invalidate_run(run_id)
+    if stale:
+        logging.info(f"Pruned checkpoints of {len(stale)} old runs")
+    return stale
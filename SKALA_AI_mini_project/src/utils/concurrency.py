@@ -0,0 +1,65 @@
+import os
+import time
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.instrumentation import company_scope, current_node, record
+from src.utils.checkpointing import current_run_id, get_unit_store
+
+# ✅ 기업별 작업의 기본 동시 실행 수 (1이면 기존과 같이 순차 실행)
+MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "4"))
+
+def run_per_company(worker, items, max_workers: int = None, step: str = None):
+    """
+    기업별 작업을 스레드 풀에서 동시에 실행합니다. 한 기업의 실패가 다른 기업에 영향을 주지 않도록
+    예외는 기업 단위로 잡아 {"error": ...} 형태로 기록합니다. 체크포인트 실행(run_scope) 중이면 성공한 기업의 결과를
+    저장해 두었다가 재실행 시 그대로 사용하므로 실패한 기업만 다시 계산합니다. 기업별 wall 시간과 워커 스레드의
+    CPU 시간은 "company" 계측 기록으로 남습니다.
+
+    Args:
+        worker (Callable): (company, value)를 받아 결과를 반환하는 함수
+        items (dict | list): 기업명 -> 값 매핑 또는 기업명 리스트 (리스트면 value는 None)
+        max_workers (int): 최대 동시 실행 수 (기본값: AGENT_MAX_WORKERS 환경 변수)
+        step (str): 체크포인트 키로 사용할 단계 이름 (한 노드에서 여러 번 호출할 때 구분, 기본값: worker 이름)
+
+    Returns:
+        dict: 입력 순서를 유지한 기업명 -> 결과 매핑
+    """
+    if not isinstance(items, dict):
+        items = {company: None for company in items}
+    max_workers = max(1, min(max_workers or MAX_WORKERS, len(items) or 1))
+    run_id, node = current_run_id(), current_node()
+    step = step or getattr(worker, "__name__", "worker")
+
+    def _run(company, value):
+        if run_id is not None:
+            cached = get_unit_store().get(run_id, node, step, company)
+            if cached is not None:
+                logging.info(f"Checkpoint hit for {company} ({node}/{step})")
+                return cached
+        with company_scope(company):
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            status = "ok"
+            try:
+                result = worker(company, value)
+            except Exception as e:
+                logging.error(f"Error analyzing {company}: {str(e)}")
+                status, result = "error", {"error": str(e)}
+            finally:
+                # 스레드 CPU 시간이므로 기업 작업이 띄운 프로세스 풀의 CPU 시간은 노드 기록에만 포함됨
+                record("company", step=step, wall_seconds=time.perf_counter() - wall_start,
+                       cpu_seconds=time.thread_time() - cpu_start, status=status)
+        if run_id is not None and not (isinstance(result, dict) and "error" in result):
+            get_unit_store().put(run_id, node, step, company, result)
+        return result
+
+    if max_workers == 1:
+        return {company: _run(company, value) for company, value in items.items()}
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="company") as executor:
+        # 작업마다 컨텍스트를 복사해 LangGraph 콜백(토큰 스트리밍 등)이 워커 스레드까지 전달되도록 함
+        futures = {
+            company: executor.submit(contextvars.copy_context().run, _run, company, value)
+            for company, value in items.items()
+        }
+        return {company: future.result() for company, future in futures.items()}
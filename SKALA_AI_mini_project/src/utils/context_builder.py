@@ -0,0 +1,154 @@
+import os
+import re
+import zlib
+import logging
+from functools import lru_cache
+
+import numpy as np
+
+from src.utils.instrumentation import record
+
+# ✅ 프롬프트 컨텍스트 설정
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2500"))  # 프롬프트당 검색 결과 토큰 상한, 0이면 제한 없음
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))  # 추정 Jaccard 유사도가 이 이상이면 중복
+CONTEXT_MODEL = os.getenv("CONTEXT_MODEL", "gpt-4o-mini")  # 토큰 수를 셀 때 사용할 모델의 인코딩
+CONTEXT_SEPARATOR = "\n\n"
+
+SHINGLE_SIZE = 5  # 문자 단위 shingle 길이 (한글은 띄어쓰기만으로 단어를 나누기 어려우므로 문자 단위 사용)
+MINHASH_PERMUTATIONS = 64
+MIN_PARTIAL_TOKENS = 64  # 남은 예산이 이보다 적으면 청크를 잘라 넣지 않음
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(0)
+_HASH_A = _rng.integers(1, _MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_HASH_B = _rng.integers(0, _MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    """
+    CONTEXT_MODEL의 tiktoken 인코딩을 반환합니다. 인코딩 파일을 받을 수 없는 환경(오프라인 등)에서는 None을
+    반환하고 UTF-8 바이트 수 기반 추정치를 사용합니다.
+    """
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(CONTEXT_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logging.warning(f"tiktoken 인코딩을 불러오지 못해 토큰 수를 추정합니다: {str(e)}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수. tiktoken을 쓸 수 없으면 UTF-8 3바이트당 1토큰으로 넉넉하게 추정합니다.
+    """
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text.encode("utf-8")) // 3 + 1 if text else 0
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    텍스트를 앞에서부터 max_tokens 토큰까지 자릅니다.
+    """
+    encoding = get_encoding()
+    if encoding is None:
+        # 추정치 기준으로 비율만큼 문자 수를 줄임
+        ratio = max_tokens / max(count_tokens(text), 1)
+        return text[:int(len(text) * min(ratio, 1.0))]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    공백을 정규화한 문자 SHINGLE_SIZE-gram 집합의 MinHash 서명. 두 서명에서 같은 값의 비율이 Jaccard
+    유사도의 추정치입니다.
+    """
+    normalized = re.sub(r"\s+", " ", text).strip().lower()
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(max(len(normalized) - SHINGLE_SIZE + 1, 1))}
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) % _MERSENNE_PRIME for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+    return ((np.outer(hashes, _HASH_A) + _HASH_B) % _MERSENNE_PRIME).min(axis=0)
+
+
+def remove_near_duplicates(texts, threshold: float = None) -> list:
+    """
+    앞선(더 관련성 높은) 청크와 추정 Jaccard 유사도가 threshold 이상인 청크를 제거합니다.
+
+    Returns:
+        list: 남긴 청크의 인덱스 (입력 순서)
+    """
+    threshold = CONTEXT_DEDUP_THRESHOLD if threshold is None else threshold
+    kept, signatures = [], []
+    for i, text in enumerate(texts):
+        signature = minhash_signature(text)
+        if any(np.mean(signature == other) >= threshold for other in signatures):
+            continue
+        kept.append(i)
+        signatures.append(signature)
+    return kept
+
+
+def build_context(documents, scores=None, budget: int = None, dedup_threshold: float = None):
+    """
+    검색 결과로 프롬프트 컨텍스트를 만듭니다. 관련성 순으로 정렬하고, 거의 같은 청크를 제거한 뒤 토큰 예산
+    안에 들어가는 청크만 담습니다. 예산을 넘는 청크는 건너뛰고 뒤의 더 짧은 청크로 채우며, 아무 청크도
+    들어가지 않으면 가장 관련성 높은 청크를 예산에 맞게 자릅니다.
+
+    Args:
+        documents (list): Document 리스트 (scores가 없으면 검색 결과 순서를 관련성 순으로 사용)
+        scores (list): 문서별 관련성 점수 (높을수록 관련성 높음, 선택)
+        budget (int): 컨텍스트 토큰 상한 (기본값: CONTEXT_TOKEN_BUDGET 환경 변수, 0이면 제한 없음)
+        dedup_threshold (float): 중복 판정 Jaccard 유사도 (기본값: CONTEXT_DEDUP_THRESHOLD 환경 변수)
+
+    Returns:
+        tuple: (컨텍스트 문자열, 사용한 Document 리스트, 통계 dict)
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    documents = list(documents or [])
+    if scores is not None:
+        order = sorted(range(len(documents)), key=lambda i: -scores[i])
+        documents = [documents[i] for i in order]
+
+    texts = [doc.page_content for doc in documents]
+    tokens = [count_tokens(text) for text in texts]
+    separator_tokens = count_tokens(CONTEXT_SEPARATOR)
+    tokens_in = sum(tokens) + separator_tokens * max(len(texts) - 1, 0)
+
+    unique = remove_near_duplicates(texts, dedup_threshold)
+
+    selected, used = [], 0
+    for i in unique:
+        cost = tokens[i] + (separator_tokens if selected else 0)
+        if budget and used + cost > budget:
+            continue
+        selected.append((i, texts[i]))
+        used += cost
+    if not selected and unique and budget >= MIN_PARTIAL_TOKENS:
+        top = unique[0]
+        selected.append((top, truncate_tokens(texts[top], budget)))
+
+    content = CONTEXT_SEPARATOR.join(text for _, text in selected)
+    tokens_out = count_tokens(content) if selected else 0
+    stats = {
+        "chunks_in": len(texts),
+        "chunks_out": len(selected),
+        "duplicates": len(texts) - len(unique),
+        "over_budget": len(unique) - len(selected),
+        "tokens_in": tokens_in,
+        "tokens_out": tokens_out,
+        "tokens_saved": tokens_in - tokens_out,
+        "budget": budget,
+    }
+    record("context", **stats)
+    logging.info(
+        f"Context: {stats['chunks_out']}/{stats['chunks_in']} chunks, {tokens_out}/{tokens_in} tokens "
+        f"(saved {stats['tokens_saved']}, duplicates {stats['duplicates']}, over budget {stats['over_budget']})"
+    )
+    return content, [documents[i] for i, _ in selected], stats
@@ -0,0 +1,286 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import functools
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from langchain_core.callbacks import BaseCallbackHandler
+
+try:
+    import resource  # Windows에는 없으므로 RSS/자식 프로세스 CPU는 기록하지 않음
+except ImportError:
+    resource = None
+
+# ✅ 계측 결과 저장 위치
+METRICS_DIR = os.getenv("METRICS_DIR", "./results/metrics")
+METRICS_MAX_RECORDS = int(os.getenv("METRICS_MAX_RECORDS", "100000"))  # 실행당 보관할 최대 기록 수 (오래된 기록부터 버림)
+
+# 현재 실행 중인 노드/기업 (스레드 풀로 컨텍스트가 복사되므로 하위 작업의 기록에도 자동으로 붙음)
+_current_node = contextvars.ContextVar("metrics_node", default=None)
+_current_company = contextvars.ContextVar("metrics_company", default=None)
+# 현재 실행의 RunMetrics (metrics_scope 밖이면 프로세스 기본 인스턴스 사용)
+_current_metrics = contextvars.ContextVar("run_metrics", default=None)
+
+
+def peak_rss_mb():
+    """
+    현재 프로세스의 최대 RSS(MB)를 반환합니다. resource 모듈이 없으면 None을 반환합니다.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def children_cpu_seconds():
+    """
+    종료된 자식 프로세스(학습/차트 프로세스 풀)가 사용한 CPU 시간 합계를 반환합니다.
+    """
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class RunMetrics:
+    """
+    한 번의 그래프 실행 동안 발생한 계측 기록을 모읍니다. 기록은 종류(kind)별 dict이며 현재 노드/기업이 자동으로
+    붙습니다.
+
+    kind:
+        - node: 노드 단위 wall/CPU 시간, 노드 실행 중 늘어난 프로세스 최대 RSS
+        - company: 노드 안의 기업별 작업(run_per_company) wall 시간과 워커 스레드 CPU 시간
+        - llm: LLM 호출의 prompt/completion 토큰 수
+        - retrieval: 벡터 DB 검색 지연 시간
+        - training: 학습 에폭 수와 에폭/초
+        - context: 프롬프트 컨텍스트 구성 전후 토큰 수와 절약한 토큰 수
+    """
+
+    def __init__(self, max_records: int = None):
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.records = deque(maxlen=max_records or METRICS_MAX_RECORDS)
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, **fields):
+        entry = {
+            "kind": kind,
+            "node": fields.pop("node", None) or _current_node.get(),
+            "company": fields.pop("company", None) or _current_company.get(),
+            "timestamp": time.time(),
+            **fields,
+        }
+        with self._lock:
+            self.records.append(entry)
+        return entry
+
+    def reset(self):
+        with self._lock:
+            self.records.clear()
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+
+    def export_jsonl(self, path: str = None) -> str:
+        """
+        기록을 JSON Lines 파일로 저장하고 경로를 반환합니다.
+        """
+        path = path or os.path.join(METRICS_DIR, f"run-{self.run_id}.jsonl")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            records = list(self.records)
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in records:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        return path
+
+    def summary(self) -> list:
+        """
+        (노드, 기업)별로 기록을 합산합니다.
+        """
+        rows = {}
+        with self._lock:
+            records = list(self.records)
+        for entry in records:
+            row = rows.setdefault((entry["node"] or "-", entry["company"] or "-"), {
+                "wall_s": 0.0, "cpu_s": 0.0, "rss_growth_mb": None, "prompt_tokens": 0, "completion_tokens": 0,
+                "llm_calls": 0, "retrieval_s": 0.0, "epochs": 0, "train_s": 0.0, "context_tokens_saved": 0,
+            })
+            kind = entry["kind"]
+            if kind in ("node", "company"):
+                row["wall_s"] += entry["wall_seconds"]
+                row["cpu_s"] += entry["cpu_seconds"]
+                if entry.get("rss_growth_mb") is not None:
+                    row["rss_growth_mb"] = max(row["rss_growth_mb"] or 0.0, entry["rss_growth_mb"])
+            elif kind == "llm":
+                row["llm_calls"] += 1
+                row["prompt_tokens"] += entry.get("prompt_tokens") or 0
+                row["completion_tokens"] += entry.get("completion_tokens") or 0
+            elif kind == "retrieval":
+                row["retrieval_s"] += entry["seconds"]
+            elif kind == "training":
+                row["epochs"] += entry["epochs"]
+                row["train_s"] += entry["seconds"]
+            elif kind == "context":
+                row["context_tokens_saved"] += entry["tokens_saved"]
+        return [{"node": node, "company": company, **row} for (node, company), row in rows.items()]
+
+    def format_summary(self) -> str:
+        """
+        summary()를 터미널 출력용 표로 만듭니다.
+        """
+        header = f"{'node':<22}{'company':<18}{'wall(s)':>9}{'cpu(s)':>9}{'rss+(MB)':>9}{'tok in':>8}{'tok out':>8}{'retr(s)':>9}{'ep/s':>8}{'tok saved':>10}"
+        lines = [header, "-" * len(header)]
+        for row in self.summary():
+            rss = f"{row['rss_growth_mb']:.0f}" if row["rss_growth_mb"] is not None else "-"
+            eps = f"{row['epochs'] / row['train_s']:.2f}" if row["train_s"] else "-"
+            lines.append(
+                f"{row['node'][:21]:<22}{row['company'][:17]:<18}{row['wall_s']:>9.2f}{row['cpu_s']:>9.2f}{rss:>9}"
+                f"{row['prompt_tokens']:>8}{row['completion_tokens']:>8}{row['retrieval_s']:>9.3f}{eps:>8}{row['context_tokens_saved']:>10}"
+            )
+        return "\n".join(lines)
+
+
+_run_metrics = RunMetrics()
+
+def get_run_metrics() -> RunMetrics:
+    """
+    현재 실행의 RunMetrics (metrics_scope 안이면 그 실행의 인스턴스, 밖이면 프로세스 기본 인스턴스).
+    """
+    return _current_metrics.get() or _run_metrics
+
+
+def scoped_metrics():
+    """
+    metrics_scope로 지정된 현재 RunMetrics (scope 밖이면 None).
+    """
+    return _current_metrics.get()
+
+
+@contextmanager
+def metrics_scope(metrics: RunMetrics = None):
+    """
+    블록 안의 기록을 별도의 RunMetrics에 모읍니다. 동시에 실행되는 그래프(API 작업 등)의 기록이 섞이거나 프로세스
+    기본 인스턴스에 계속 쌓이지 않도록 실행마다 사용합니다.
+
+    Args:
+        metrics (RunMetrics): 기록을 모을 인스턴스 (기본값: 새 인스턴스)
+    """
+    metrics = metrics or RunMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+def current_node():
+    """
+    현재 실행 중인 그래프 노드 이름 (노드 밖이면 None).
+    """
+    return _current_node.get()
+
+
+def record(kind: str, **fields):
+    """
+    현재 실행의 계측 기록을 추가합니다.
+    """
+    return get_run_metrics().record(kind, **fields)
+
+
+@contextmanager
+def company_scope(company: str):
+    """
+    블록 안에서 발생한 기록에 기업명을 붙입니다.
+    """
+    token = _current_company.set(company)
+    try:
+        yield
+    finally:
+        _current_company.reset(token)
+
+
+@contextmanager
+def track(kind: str, **fields):
+    """
+    블록의 소요 시간(seconds)을 kind 기록으로 남깁니다. (예: 벡터 DB 검색 지연 시간)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(kind, seconds=time.perf_counter() - start, **fields)
+
+
+def instrument_node(name: str, fn):
+    """
+    그래프 노드 함수를 감싸 wall/CPU 시간과 노드 실행 중 늘어난 최대 RSS(rss_growth_mb)를 기록합니다. CPU 시간과
+    RSS는 프로세스 전체 기준(병렬 노드끼리 겹칠 수 있음)이며, 노드가 띄운 프로세스 풀의 CPU 시간도 더합니다.
+    """
+    @functools.wraps(fn)
+    def wrapper(state):
+        token = _current_node.set(name)
+        wall_start, cpu_start, children_start = time.perf_counter(), time.process_time(), children_cpu_seconds()
+        rss_start = peak_rss_mb()
+        status = "ok"
+        try:
+            return fn(state)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            entry = record(
+                "node",
+                wall_seconds=time.perf_counter() - wall_start,
+                cpu_seconds=(time.process_time() - cpu_start) + (children_cpu_seconds() - children_start),
+                # ru_maxrss는 프로세스 수명 동안의 최댓값이므로 노드 시작 시점 대비 증가분만 기록
+                rss_growth_mb=peak_rss_mb() - rss_start if rss_start is not None else None,
+                status=status,
+            )
+            logging.info(f"Node {name} finished in {entry['wall_seconds']:.2f}s (cpu {entry['cpu_seconds']:.2f}s)")
+            _current_node.reset(token)
+
+    return wrapper
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """
+    LLM 호출이 끝날 때 토큰 사용량을 기록하는 콜백. 체인이 호출한 스레드에서 바로 실행되므로 현재 노드/기업이
+    함께 기록됩니다.
+    """
+
+    run_inline = True
+
+    def on_llm_end(self, response, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens, completion_tokens = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        if prompt_tokens is None:
+            # 스트리밍 응답 등 llm_output이 없는 경우 메시지의 usage_metadata 사용
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    prompt_tokens = (prompt_tokens or 0) + metadata.get("input_tokens", 0)
+                    completion_tokens = (completion_tokens or 0) + metadata.get("output_tokens", 0)
+        record("llm", prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+               model=(response.llm_output or {}).get("model_name"))
+
+
+token_usage_handler = TokenUsageHandler()
+_token_usage_var = contextvars.ContextVar("token_usage_handler", default=token_usage_handler)
+_hook_lock = threading.Lock()
+_hook_installed = False
+
+def install_token_usage_hook():
+    """
+    모든 체인 실행의 콜백 매니저에 token_usage_handler를 자동으로 추가합니다. (invoke마다 config를 넘기면 LangGraph
+    스트리밍 콜백을 덮어쓰므로) langchain_core.tracers(langsmith 포함) 임포트가 무거워 첫 LLM 호출 직전에 등록합니다.
+    """
+    global _hook_installed
+    with _hook_lock:
+        if not _hook_installed:
+            from langchain_core.tracers.context import register_configure_hook
+
+            register_configure_hook(_token_usage_var, inheritable=True)
+            _hook_installed = True
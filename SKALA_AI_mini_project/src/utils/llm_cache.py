@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from src.utils.instrumentation import install_token_usage_hook
+
+# ✅ LLM 응답 캐시 설정
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./cache/llm_cache.sqlite3")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # 초 단위, 0이면 만료 없음
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+
+def hash_documents(documents):
+    """
+    검색된 문서(Document 또는 문자열) 목록을 순서대로 해시합니다.
+    """
+    hashes = []
+    for doc in documents or ():
+        text = getattr(doc, "page_content", doc)
+        hashes.append(hashlib.sha256(str(text).encode("utf-8")).hexdigest())
+    return hashes
+
+
+class LLMCache:
+    """
+    SQLite 기반 LLM 응답 캐시. 모델명, temperature, 렌더링된 프롬프트 해시, 검색 문서 해시를 키로 사용하며
+    TTL 만료와 항목 수/용량 기반 LRU 제거, hit/miss 카운터를 지원합니다.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 bypass: bool = LLM_CACHE_BYPASS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, temperature, prompt: str, documents=()):
+        """
+        캐시 키를 생성합니다.
+        """
+        payload = json.dumps({
+            "model": model,
+            "temperature": temperature,
+            "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            "documents": hash_documents(documents),
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        캐시된 값을 반환합니다. 없거나 만료되었으면 None을 반환합니다.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value):
+        """
+        값을 저장하고 TTL/용량 제한을 적용합니다.
+        """
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        rows = self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at ASC")
+        stale = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        if stale:
+            self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", stale)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self):
+        """
+        hit/miss 카운터와 현재 항목 수를 반환합니다.
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    """
+    프로세스 전역 LLM 캐시를 반환합니다.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def cached_invoke(chain, inputs: dict, documents=(), bypass: bool = None, label: str = None):
+    """
+    `prompt | llm | parser` 형태의 체인을 캐시를 거쳐 실행합니다.
+
+    Args:
+        chain (RunnableSequence): 프롬프트 템플릿으로 시작하는 체인
+        inputs (dict): 프롬프트 입력 값
+        documents (list): 프롬프트에 사용된 검색 문서 (캐시 키에 포함)
+        bypass (bool): True면 캐시를 조회하지 않고 LLM을 호출 (기본값: LLM_CACHE_BYPASS 환경 변수)
+        label (str): 실행 태그 (스트리밍 출력에서 어떤 기업의 토큰인지 구분하는 데 사용)
+
+    Returns:
+        str: 체인 출력 결과
+    """
+    install_token_usage_hook()
+    cache = get_llm_cache()
+    config = {"tags": [label]} if label else None
+    if bypass is None:
+        bypass = cache.bypass
+    if bypass:
+        return chain.invoke(inputs, config=config)
+
+    llm = chain.middle[0] if chain.middle else chain.last
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    key = cache.make_key(model, getattr(llm, "temperature", None), chain.first.format(**inputs), documents)
+
+    cached = cache.get(key)
+    if cached is not None:
+        logging.info(f"LLM cache hit ({model})")
+        return cached
+
+    result = chain.invoke(inputs, config=config)
+    cache.put(key, result)
+    return result
@@ -0,0 +1,181 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+from src.utils.instrumentation import track
+
+# ✅ 쿼리 임베딩 LRU 캐시 크기
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+
+class QueryEmbeddingCache:
+    """
+    (임베딩 모델, 쿼리 문자열) -> 임베딩 벡터를 보관하는 메모리 LRU 캐시. 캐시에 없는 쿼리만 모아 한 번의
+    embed_documents 호출로 임베딩합니다. 모델 객체별로 구분하므로 차원이 다른 모델의 벡터가 섞이지 않습니다.
+    """
+
+    def __init__(self, max_size: int = QUERY_EMBEDDING_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, queries, embeddings):
+        """
+        쿼리 목록의 임베딩을 입력 순서대로 반환합니다.
+
+        Args:
+            queries (list): 쿼리 문자열 목록
+            embeddings (Embeddings): embed_documents를 제공하는 임베딩 모델
+
+        Returns:
+            list: 쿼리별 임베딩 벡터
+        """
+        model = id(embeddings)
+        with self._lock:
+            missing = [q for q in dict.fromkeys(queries) if (model, q) not in self._entries]
+            self.hits += len(queries) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = embeddings.embed_documents(missing)
+            with self._lock:
+                for query, vector in zip(missing, vectors):
+                    self._entries[(model, query)] = vector
+
+        with self._lock:
+            result = []
+            for query in queries:
+                self._entries.move_to_end((model, query))
+                result.append(self._entries[(model, query)])
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return result
+
+
+_query_cache = QueryEmbeddingCache()
+
+def get_query_cache() -> QueryEmbeddingCache:
+    return _query_cache
+
+
+def query_collection(vector_db, vectors, k: int, where: dict = None):
+    """
+    여러 쿼리 벡터를 한 번의 Chroma 질의로 검색합니다. langchain-chroma에는 여러 벡터를 한 번에 검색하는 공개
+    메서드가 없으므로 기반 chromadb 컬렉션(Chroma._collection)을 이 함수에서만 사용하고, 속성이 없는 버전에서는
+    공개 API(similarity_search_by_vector)로 쿼리마다 검색합니다. (requirements.txt에서 langchain-chroma 버전 고정)
+
+    Returns:
+        list: 쿼리별 Document 리스트 (유사도 순)
+    """
+    collection = getattr(vector_db, "_collection", None)
+    if collection is None:
+        return [vector_db.similarity_search_by_vector(vector, k=k, filter=where) for vector in vectors]
+    response = collection.query(
+        query_embeddings=vectors,
+        n_results=k,
+        where=where,
+        include=["documents", "metadatas", "distances"],
+    )
+    return [
+        [Document(page_content=text, metadata=metadata or {}) for text, metadata in zip(texts, metadatas)]
+        for texts, metadatas in zip(response["documents"], response["metadatas"])
+    ]
+
+
+def batch_similarity_search(vector_db, queries, k: int = 5, where: dict = None):
+    """
+    여러 쿼리를 한 번에 임베딩하고 한 번의 Chroma 질의로 검색합니다.
+
+    Args:
+        vector_db (Chroma): 검색 대상 벡터 DB
+        queries (list): 쿼리 문자열 목록
+        k (int): 쿼리별 반환 문서 수
+        where (dict): Chroma 메타데이터 필터 (선택)
+
+    Returns:
+        dict: 쿼리 -> Document 리스트 (유사도 순)
+    """
+    queries = list(queries)
+    if not queries:
+        return {}
+    with track("retrieval", method="batch_similarity", queries=len(queries)):
+        vectors = _query_cache.embed(queries, vector_db.embeddings)
+        results = dict(zip(queries, query_collection(vector_db, vectors, k, where)))
+    logging.info(f"Batch retrieval: {len(queries)} queries in one vector store query")
+    return results
+
+
+def is_equality_filter(where) -> bool:
+    """
+    {키: 값} 형태의 단순 일치 필터인지 확인합니다. ($and, $in 등 연산자가 없는 필터)
+    """
+    return isinstance(where, dict) and bool(where) and not any(
+        key.startswith("$") or isinstance(value, dict) for key, value in where.items()
+    )
+
+
+def mmr_select(vector, candidates, embeddings, k: int, fetch_k: int, lambda_mult: float):
+    """
+    후보 중 쿼리와 L2 거리가 가까운 fetch_k개를 고르고 그 안에서 MMR로 k개를 선택합니다. Chroma의
+    max_marginal_relevance_search_by_vector와 같이 선택된 문서를 거리 순으로 반환합니다.
+    """
+    if not candidates:
+        return []
+    query = np.asarray(vector, dtype=np.float32)
+    order = np.argsort(np.linalg.norm(embeddings - query, axis=1), kind="stable")[:fetch_k]
+    selected = set(maximal_marginal_relevance(query, embeddings[order], k=k, lambda_mult=lambda_mult))
+    return [candidates[j] for i, j in enumerate(order) if i in selected]
+
+
+def filtered_mmr_search(vector_db, query_filters: dict, k: int = 5, fetch_k: int = 20, lambda_mult: float = 0.5):
+    """
+    쿼리별 메타데이터 where 필터로 후보를 좁힌 뒤 그 안에서 MMR(최대 한계 관련성)로 문서를 고릅니다.
+    쿼리 임베딩은 한 번의 호출로 계산하고, 단순 일치 필터({키: 값})는 모든 쿼리의 후보를 한 번의 Chroma get으로
+    가져와 쿼리별 필터/MMR을 메모리에서 계산합니다. 그 밖의 필터는 쿼리마다 Chroma에서 검색합니다.
+
+    Args:
+        vector_db (Chroma): 검색 대상 벡터 DB
+        query_filters (dict): 쿼리 -> Chroma where 필터 (None이면 필터 없음)
+        k (int): 쿼리별 반환 문서 수
+        fetch_k (int): MMR 후보 문서 수
+        lambda_mult (float): 관련성(1)과 다양성(0) 사이의 가중치
+
+    Returns:
+        dict: 쿼리 -> Document 리스트
+    """
+    queries = list(query_filters)
+    if not queries:
+        return {}
+    with track("retrieval", method="filtered_mmr", queries=len(queries)):
+        vectors = dict(zip(queries, _query_cache.embed(queries, vector_db.embeddings)))
+        batched = [query for query in queries if is_equality_filter(query_filters[query])]
+        results = {}
+
+        if batched:
+            filters = list({repr(sorted(query_filters[q].items())): query_filters[q] for q in batched}.values())
+            response = vector_db.get(
+                where=filters[0] if len(filters) == 1 else {"$or": filters},
+                include=["documents", "metadatas", "embeddings"],
+            )
+            metadatas = [metadata or {} for metadata in response["metadatas"]]
+            documents = [Document(page_content=text, metadata=metadata)
+                         for text, metadata in zip(response["documents"], metadatas)]
+            embeddings = np.asarray(response["embeddings"], dtype=np.float32)
+            for query in batched:
+                where = query_filters[query]
+                rows = [i for i, metadata in enumerate(metadatas)
+                        if all(metadata.get(key) == value for key, value in where.items())]
+                results[query] = mmr_select(vectors[query], [documents[i] for i in rows],
+                                            embeddings[rows], k, fetch_k, lambda_mult)
+
+        for query in queries:
+            if query not in results:
+                results[query] = vector_db.max_marginal_relevance_search_by_vector(
+                    vectors[query], k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=query_filters[query]
+                )
+        return {query: results[query] for query in queries}
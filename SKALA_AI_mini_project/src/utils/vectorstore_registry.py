@@ -0,0 +1,63 @@
+import os
+import time
+import logging
+import threading
+
+# ✅ 공용 임베딩 모델 및 벡터 DB 경로 (이름 -> (환경 변수, 기본 경로))
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+VECTOR_STORES = {
+    "company": ("COMPANY_DB_PATH", "./vectorstores/company_db"),
+    "battery": ("BATTERY_DB_PATH", "./vectorstores/battery_db"),
+}
+
+_lock = threading.RLock()
+_embeddings = None
+_vector_stores = {}
+_load_times = {}
+
+
+def get_embeddings():
+    """
+    프로세스 전역 임베딩 모델을 반환합니다. 최초 호출 시에만 모델 가중치를 로드합니다.
+    """
+    global _embeddings
+    with _lock:
+        if _embeddings is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+
+            start = time.perf_counter()
+            _embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+            _load_times["embeddings"] = time.perf_counter() - start
+            logging.info(f"Embedding model loaded in {_load_times['embeddings']:.2f}s ({EMBEDDING_MODEL_NAME})")
+        return _embeddings
+
+
+def get_vector_store(name: str):
+    """
+    이름("company", "battery") 또는 경로로 Chroma 벡터 DB를 반환합니다. 최초 사용 시에만 클라이언트를 생성합니다.
+
+    Args:
+        name (str): VECTOR_STORES의 키 또는 persist 디렉토리 경로
+
+    Returns:
+        Chroma: 공유 임베딩 모델을 사용하는 벡터 DB
+    """
+    path = os.getenv(*VECTOR_STORES[name]) if name in VECTOR_STORES else name
+    with _lock:
+        if path not in _vector_stores:
+            embeddings = get_embeddings()
+            from langchain_chroma import Chroma
+
+            start = time.perf_counter()
+            _vector_stores[path] = Chroma(persist_directory=path, embedding_function=embeddings)
+            _load_times[f"vector_store:{name}"] = time.perf_counter() - start
+            logging.info(f"Vector store '{name}' loaded in {_load_times[f'vector_store:{name}']:.2f}s ({path})")
+        return _vector_stores[path]
+
+
+def load_times():
+    """
+    지금까지 로드된 리소스별 로드 시간(초)을 반환합니다.
+    """
+    with _lock:
+        return dict(_load_times)
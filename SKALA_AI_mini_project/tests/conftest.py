@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.output_parsers import StrOutputParser
+
+# 프로젝트 루트(src, benchmarks 패키지)를 임포트 경로에 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.fixtures import EMBEDDING_SIZE, FakeChatModel, SyntheticSource, build_chroma_fixture  # noqa: E402
+
+WATCHLISTS = [{"삼성 SDI": "006400.KS"}, {"LG에너지솔루션": "373220.KS"}]
+
+
+@pytest.fixture
+def offline_pipeline(tmp_path, monkeypatch):
+    """
+    실제 그래프를 실행하되 LLM은 FakeChatModel, yfinance는 합성 주가 소스로 대체합니다. 상대 경로(캐시, 체크포인트,
+    모델 레지스트리)는 모두 tmp_path 아래에 생성됩니다.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("COMPANY_DB_PATH", str(tmp_path / "vectorstores" / "company_db"))
+    monkeypatch.setenv("BATTERY_DB_PATH", str(tmp_path / "vectorstores" / "battery_db"))
+
+    from src.agents import company_analysis, market_analysis, report_generator, stock_price_predictor, supervisor
+    from src.fetcher import price_store
+    from src.utils import checkpointing, llm_cache, vectorstore_registry
+
+    # LLM 대체
+    fake = FakeChatModel()
+    for module, name in ((company_analysis, "company_analysis_chain"), (market_analysis, "battery_analysis_chain"),
+                         (stock_price_predictor, "stock_chain")):
+        monkeypatch.setattr(module, name, getattr(module, name).first | fake | StrOutputParser())
+
+    # yfinance 대체
+    monkeypatch.setattr(price_store, "_default_store",
+                        price_store.PriceStore(root=str(tmp_path / "raw"), source=SyntheticSource()))
+
+    # 테스트마다 새 캐시/체크포인트/벡터 DB 사용
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(":memory:"))
+    monkeypatch.setattr(checkpointing, "_checkpointer", None)
+    monkeypatch.setattr(checkpointing, "_unit_store", None)
+    monkeypatch.setattr(supervisor, "_checkpointed_graph", None)
+    monkeypatch.setattr(vectorstore_registry, "_embeddings", DeterministicFakeEmbedding(size=EMBEDDING_SIZE))
+    monkeypatch.setattr(vectorstore_registry, "_vector_stores", {})
+    build_chroma_fixture(str(tmp_path / "vectorstores"), [company for watchlist in WATCHLISTS for company in watchlist])
+
+    try:
+        import weasyprint  # noqa: F401
+    except ImportError:
+        # WeasyPrint(시스템 라이브러리 필요)가 없는 환경에서는 PDF 렌더링만 HTML 저장으로 대체
+        monkeypatch.setattr(report_generator, "save_html_to_pdf",
+                            lambda html, path: report_generator.write_text(path, html))
+    return tmp_path
@@ -0,0 +1,85 @@
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+from src.api.server import JobManager, ReportRequest, create_app, request_key
+from tests.conftest import WATCHLISTS
+
+
+def wait_for(client, job_id, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/reports/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.5)
+    raise TimeoutError(job_id)
+
+
+def test_report_jobs_run_real_graph(offline_pipeline):
+    jobs_dir = offline_pipeline / "jobs"
+    app = create_app(warmup=False, jobs_dir=str(jobs_dir), artifacts_dir=str(offline_pipeline / "artifacts"))
+    # 두 작업이 같은 티커(삼성 SDI)의 주가 저장소와 모델 레지스트리를 동시에 갱신
+    watchlists = [WATCHLISTS[0], {**WATCHLISTS[0], **WATCHLISTS[1]}]
+    with TestClient(app) as client:
+        submitted = [client.post("/reports", json={"watchlist": watchlist}).json() for watchlist in watchlists]
+        jobs = [wait_for(client, job["job_id"]) for job in submitted]
+
+        for watchlist, job in zip(watchlists, jobs):
+            assert job["status"] == "done", job.get("error")
+            assert set(job["artifacts"]) == {"pdf", "html", "metrics"}
+            assert client.get(f"/artifacts/{job['artifacts']['html']}").status_code == 200
+
+            # 작업별 계측 결과: 상태 응답의 요약과 작업 디렉토리의 JSON Lines
+            rows = {(row["node"], row["company"]): row for row in job["metrics"]}
+            assert all((node, "-") in rows for node in ("market_research", "company_analysis", "report_generation"))
+            assert all(rows[("company_analysis", company)]["wall_s"] > 0 for company in watchlist)
+            assert sum(row["llm_calls"] for row in job["metrics"]) > 0
+            records = client.get(f"/artifacts/{job['artifacts']['metrics']}").text.splitlines()
+            assert records and (jobs_dir / job["job_id"] / "metrics.jsonl").exists()
+
+            # 차트는 작업별 출력 디렉토리에 저장되고 다른 작업의 기업 차트는 없음
+            charts = os.listdir(jobs_dir / job["job_id"] / "output")
+            assert all(f"{company}_forecast.png" in charts for company in watchlist)
+            assert all(any(name.startswith(company) for company in watchlist) for name in charts)
+
+        # 동시 저장에 쓴 임시 파일이 남지 않음
+        leftovers = [os.path.join(root, name) for root, _, names in os.walk(offline_pipeline)
+                     for name in names if name.endswith(".tmp")]
+        assert leftovers == []
+
+        # 같은 날 같은 요청은 다시 실행하지 않고 완료된 작업을 반환
+        again = client.post("/reports", json={"watchlist": watchlists[0]}).json()
+        assert again["job_id"] == jobs[0]["job_id"]
+        assert again["status"] == "done"
+
+
+def test_request_key_changes_with_run_date():
+    request = ReportRequest(watchlist=WATCHLISTS[0])
+    assert request_key(request, "2025-01-02") == request_key(request, "2025-01-02")
+    assert request_key(request, "2025-01-02") != request_key(request, "2025-01-03")
+
+
+def test_finished_jobs_are_evicted(tmp_path):
+    runs = []
+
+    def runner(state):
+        runs.append(state)
+        return {"report": {}}
+
+    manager = JobManager(runner=runner, jobs_dir=str(tmp_path / "jobs"), artifacts_dir=str(tmp_path / "artifacts"),
+                         retention=0)
+    try:
+        request = ReportRequest(watchlist=WATCHLISTS[0])
+        job_id = manager.submit(request)["job_id"]
+        while manager.jobs.get(job_id, {}).get("status") not in ("done", None):
+            time.sleep(0.05)
+
+        # 보관 시간이 지난 완료 작업은 제거되고 같은 요청은 다시 실행됨
+        assert manager.get(job_id) is None
+        assert manager.submit(request)["status"] == "queued"
+        while len(runs) < 2:
+            time.sleep(0.05)
+    finally:
+        manager.shutdown()
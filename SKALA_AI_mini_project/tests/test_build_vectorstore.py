@@ -0,0 +1,42 @@
+import uuid
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.ingestion.build_vectorstore import build_vectorstore
+from src.utils import vectorstore_registry
+from src.utils.vectorstore_registry import get_vector_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(vectorstore_registry, "_embeddings", DeterministicFakeEmbedding(size=32))
+    monkeypatch.setattr(vectorstore_registry, "_vector_stores", {})
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "market.txt").write_text("배터리 시장 동향 보고서 본문", encoding="utf-8")
+
+    db_path = str(tmp_path / "db")
+    # 해시 id 도입 전 방식(UUID id)으로 만든 기존 DB
+    get_vector_store(db_path).add_documents([Document(page_content="기존 청크")], ids=[str(uuid.uuid4())])
+    return db_path, str(docs)
+
+
+def test_first_sync_keeps_legacy_chunks(store):
+    db_path, docs = store
+
+    stats = build_vectorstore(db_path, docs, tag_companies=False)
+
+    assert stats["added"] == 1 and stats["deleted"] == 0 and stats["legacy_kept"] == 1
+    assert len(get_vector_store(db_path).get(include=[])["ids"]) == 2
+
+
+def test_prune_legacy_removes_legacy_chunks(store):
+    db_path, docs = store
+    build_vectorstore(db_path, docs, tag_companies=False)
+
+    stats = build_vectorstore(db_path, docs, tag_companies=False, prune_legacy=True)
+
+    assert stats == {**stats, "added": 0, "deleted": 1, "unchanged": 1, "legacy_kept": 0}
+    assert len(get_vector_store(db_path).get(include=[])["ids"]) == 1
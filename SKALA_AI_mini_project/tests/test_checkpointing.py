@@ -0,0 +1,71 @@
+import operator
+import time
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import StateGraph
+
+from src.utils import checkpointing
+
+
+class CountState(TypedDict):
+    steps: Annotated[list, operator.add]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpointing, "GRAPH_CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setattr(checkpointing, "_checkpointer", None)
+    monkeypatch.setattr(checkpointing, "_unit_store", checkpointing.UnitStore(str(tmp_path / "checkpoints.sqlite3")))
+
+    graph = StateGraph(CountState)
+    graph.add_node("step", lambda state: {"steps": [1]})
+    graph.set_entry_point("step")
+    graph.set_finish_point("step")
+    app = graph.compile(checkpointer=checkpointing.get_checkpointer())
+
+    def run(run_id, age_days=0.0):
+        config = {"configurable": {"thread_id": run_id}}
+        app.invoke({"steps": []}, config)
+        checkpointing.get_unit_store().put(run_id, "step", "work", "삼성 SDI", {"ok": True})
+        checkpointing.get_unit_store().touch_run(run_id)
+        with checkpointing.get_unit_store()._conn as conn:
+            conn.execute("UPDATE runs SET last_used = ? WHERE run_id = ?", (time.time() - age_days * 86400, run_id))
+        return config
+
+    return app, run
+
+
+def remaining(app, run_ids):
+    return [run_id for run_id in run_ids
+            if app.get_state({"configurable": {"thread_id": run_id}}).values
+            or checkpointing.get_unit_store().get(run_id, "step", "work", "삼성 SDI") is not None]
+
+
+def test_prune_by_age(store):
+    app, run = store
+    run("old", age_days=10)
+    run("recent", age_days=1)
+    run("current", age_days=30)
+
+    assert checkpointing.prune_runs(keep="current", max_age_days=7, max_runs=0) == ["old"]
+    assert remaining(app, ["old", "recent", "current"]) == ["recent", "current"]
+
+
+def test_prune_by_count(store):
+    app, run = store
+    for i, run_id in enumerate(["a", "b", "c", "d"]):
+        run(run_id, age_days=4 - i)  # d가 가장 최근
+
+    assert sorted(checkpointing.prune_runs(keep="a", max_age_days=0, max_runs=2)) == ["b", "c"]
+    assert remaining(app, ["a", "b", "c", "d"]) == ["a", "d"]
+
+
+def test_untracked_runs_are_registered(store):
+    app, run = store
+    run("legacy")
+    with checkpointing.get_unit_store()._conn as conn:
+        conn.execute("DELETE FROM runs")  # 사용 시각 기록 이전에 만들어진 실행
+
+    assert checkpointing.prune_runs(max_age_days=7, max_runs=0) == []
+    assert [run_id for run_id, _ in checkpointing.get_unit_store().list_runs()] == ["legacy"]
@@ -0,0 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+import numpy as np
+from PIL import Image
+
+from src.agents.data_visualizer import forecast_key, is_up_to_date, render_forecast_chart
+
+
+def forecast(offset):
+    dates = np.arange("2025-01-01", "2025-03-01", dtype="datetime64[D]")
+    return {"dates": dates, "values": np.linspace(100, 200, len(dates)) + offset}
+
+
+def test_concurrent_renders_leave_rcparams_untouched(tmp_path):
+    before = dict(matplotlib.rcParams)
+    jobs = {company: forecast(i) for i, company in enumerate(["삼성 SDI", "LG에너지솔루션", "SK온", "에코프로비엠"])}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        paths = list(executor.map(
+            lambda item: render_forecast_chart(item[0], item[1], str(tmp_path / f"{item[0]}.png"), forecast_key(item[1])),
+            jobs.items(),
+        ))
+
+    assert dict(matplotlib.rcParams) == before
+    for (company, data), path in zip(jobs.items(), paths):
+        assert Image.open(path).size == (1000, 600)
+        assert is_up_to_date(path, forecast_key(data))
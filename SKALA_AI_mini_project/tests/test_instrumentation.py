@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.concurrency import run_per_company
+from src.utils.instrumentation import RunMetrics, get_run_metrics, instrument_node, metrics_scope
+
+
+def busy(seconds):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+def analyze(company, value):
+    busy(value)
+    if company == "C":
+        raise RuntimeError("boom")
+    return company
+
+
+def node(state):
+    return {"result": run_per_company(analyze, state["items"], max_workers=3)}
+
+
+def test_company_rows_have_their_own_time():
+    with metrics_scope() as metrics:
+        result = instrument_node("company_analysis", node)({"items": {"A": 0.05, "B": 0.15, "C": 0.0}})
+
+    assert result["result"]["C"] == {"error": "boom"}
+    rows = {row["company"]: row for row in metrics.summary()}
+    assert rows["A"]["wall_s"] > 0 and rows["A"]["cpu_s"] >= 0.04
+    assert rows["B"]["cpu_s"] > rows["A"]["cpu_s"]
+    assert all(row["node"] == "company_analysis" for row in rows.values())
+    assert [r["status"] for r in metrics.records if r["kind"] == "company" and r["company"] == "C"] == ["error"]
+
+    # 노드 기록은 최대 RSS 절대값이 아니라 노드 실행 중 증가분
+    assert rows["-"]["rss_growth_mb"] is None or 0 <= rows["-"]["rss_growth_mb"] < 1024
+
+
+def test_runs_do_not_share_records():
+    default_before = len(get_run_metrics().records)
+
+    def run(items):
+        with metrics_scope() as metrics:
+            instrument_node("company_analysis", node)({"items": items})
+        return metrics
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first, second = executor.map(run, [{"A": 0.0}, {"B": 0.0, "C": 0.0}])
+
+    assert {r["company"] for r in first.records} == {"A", None}
+    assert {r["company"] for r in second.records} == {"B", "C", None}
+    assert len(get_run_metrics().records) == default_before
+
+
+def test_records_are_capped():
+    metrics = RunMetrics(max_records=3)
+    for i in range(5):
+        metrics.record("llm", prompt_tokens=i)
+    assert [r["prompt_tokens"] for r in metrics.records] == [2, 3, 4]
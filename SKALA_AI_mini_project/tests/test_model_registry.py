@@ -0,0 +1,53 @@
+import pytest
+
+from benchmarks.fixtures import synthetic_ohlcv
+from src.models.model_registry import ModelRegistry
+from src.models.stock_predictor_model import transformer_forecast
+
+TICKER = "TEST.KS"
+
+
+@pytest.fixture
+def prices():
+    return synthetic_ohlcv(TICKER, periods=300)
+
+
+def forecast_mode(df, registry):
+    _, metrics = transformer_forecast(df, window_size=10, epochs=1, ticker=TICKER, registry=registry,
+                                      return_metrics=True)
+    return metrics["mode"]
+
+
+def test_shifted_window_fine_tunes(prices, tmp_path):
+    # 이동 구간(최근 1년)처럼 하루가 지나 앞쪽 한 행이 빠지고 뒤쪽 한 행이 추가된 경우
+    registry = ModelRegistry(str(tmp_path))
+    assert forecast_mode(prices.iloc[:250], registry) == "train"
+    assert forecast_mode(prices.iloc[1:251], registry) == "fine_tune"
+    assert forecast_mode(prices.iloc[1:251], registry) == "reuse"
+
+
+def test_extended_window_fine_tunes(prices, tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    assert forecast_mode(prices.iloc[:250], registry) == "train"
+    assert forecast_mode(prices.iloc[:251], registry) == "fine_tune"
+
+
+def test_unchanged_subset_reuses(prices, tmp_path):
+    # 시작일만 뒤로 밀리고 새 날짜가 없으면 저장된 모델을 그대로 사용
+    registry = ModelRegistry(str(tmp_path))
+    assert forecast_mode(prices.iloc[:250], registry) == "train"
+    assert forecast_mode(prices.iloc[5:250], registry) == "reuse"
+
+
+def test_changed_history_retrains(prices, tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    assert forecast_mode(prices.iloc[:250], registry) == "train"
+    revised = prices.iloc[1:251].copy()
+    revised.iloc[100, revised.columns.get_loc("Close")] *= 1.01  # 겹치는 과거 구간의 값이 바뀜 (수정 주가 등)
+    assert forecast_mode(revised, registry) == "train"
+
+
+def test_gap_without_overlap_retrains(prices, tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    assert forecast_mode(prices.iloc[:100], registry) == "train"
+    assert forecast_mode(prices.iloc[150:300], registry) == "train"
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from src.fetcher.price_store import PriceStore
+
+
+class RecordingSource:
+    """
+    listed 이후 영업일의 OHLCV를 반환하고 요청한 (start, end) 구간을 기록하는 데이터 소스.
+    """
+
+    def __init__(self, listed="2015-01-01", last=None):
+        self.dates = pd.bdate_range(listed, last or pd.Timestamp.today().normalize(), name="Date")
+        self.calls = []
+
+    def fetch(self, ticker, start=None, end=None, interval="1d"):
+        self.calls.append((start, end))
+        dates = self.dates
+        if start:
+            dates = dates[dates >= pd.Timestamp(start)]
+        if end:
+            dates = dates[dates < pd.Timestamp(end)]
+        values = np.arange(len(dates), dtype="float64")
+        return pd.DataFrame({c: values for c in ["Close", "High", "Low", "Open", "Volume"]}, index=dates)
+
+
+def test_longer_period_backfills_head(tmp_path):
+    source = RecordingSource()
+    store = PriceStore(root=str(tmp_path), source=source)
+    today = pd.Timestamp.today().normalize()
+
+    one_year = store.update("삼성 SDI", "006400.KS", period="1y")
+    five_years = store.update("삼성 SDI", "006400.KS", period="5y")
+
+    assert one_year.index[0] >= today - pd.DateOffset(years=1)
+    assert five_years.index[0] < today - pd.DateOffset(years=5) + pd.Timedelta(days=5)
+    assert len(five_years) > 4 * len(one_year)
+    # 앞 구간은 첫 저장일 직전까지만 요청
+    assert (source.calls[-1][1] == one_year.index[0].strftime("%Y-%m-%d"))
+
+
+def test_backfill_is_not_repeated_before_listing(tmp_path):
+    listed = pd.Timestamp.today().normalize() - pd.DateOffset(years=2)
+    source = RecordingSource(listed=listed)
+    store = PriceStore(root=str(tmp_path), source=source)
+
+    first = store.update("LG에너지솔루션", "373220.KS", period="5y")
+    calls = len(source.calls)
+    second = store.update("LG에너지솔루션", "373220.KS", period="5y")
+
+    assert first.index[0] >= listed
+    assert second.index.equals(first.index)
+    # 상장일 이전 구간은 이미 요청했으므로 마지막 저장일 이후 구간만 다시 요청
+    assert len(source.calls) == calls + 1
+    assert source.calls[-1][0] == first.index[-1].strftime("%Y-%m-%d")
+
+
+def test_window_anchors_to_last_stored_date_without_new_rows(tmp_path):
+    last = pd.Timestamp.today().normalize() - pd.DateOffset(months=3)
+    store = PriceStore(root=str(tmp_path), source=RecordingSource(last=last))
+
+    history = store.update("삼성 SDI", "006400.KS", period="1y")
+
+    assert not history.empty
+    assert history.index[-1] <= last
+    assert history.index[0] >= last - pd.DateOffset(years=1)
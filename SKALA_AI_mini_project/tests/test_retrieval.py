@@ -0,0 +1,77 @@
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from src.utils import retrieval
+from src.utils.retrieval import QueryEmbeddingCache, batch_similarity_search, filtered_mmr_search
+
+COMPANIES = ["삼성 SDI", "LG에너지솔루션", "SK온"]
+
+
+@pytest.fixture
+def vector_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieval, "_query_cache", QueryEmbeddingCache())
+    db = Chroma(persist_directory=str(tmp_path / "db"), embedding_function=DeterministicFakeEmbedding(size=16))
+    documents = [
+        Document(page_content=f"{company} 배터리 사업 보고서 {i}",
+                 metadata={"company": company, f"mentions_{j}": True, "other": j == 0})
+        for j, company in enumerate(COMPANIES) for i in range(12)
+    ]
+    db.add_documents(documents, ids=[str(i) for i in range(len(documents))])
+    return db
+
+
+def contents(docs):
+    return [doc.page_content for doc in docs]
+
+
+def test_batch_similarity_matches_per_query_search(vector_db):
+    results = batch_similarity_search(vector_db, COMPANIES, k=4)
+
+    for company in COMPANIES:
+        vector = vector_db.embeddings.embed_documents([company])[0]
+        assert contents(results[company]) == contents(vector_db.similarity_search_by_vector(vector, k=4))
+
+
+def test_filtered_mmr_matches_chroma_in_one_round_trip(vector_db, monkeypatch):
+    filters = {company: {f"mentions_{j}": True} for j, company in enumerate(COMPANIES)}
+    expected = {}
+    for company, where in filters.items():
+        vector = vector_db.embeddings.embed_documents([company])[0]
+        expected[company] = contents(vector_db.max_marginal_relevance_search_by_vector(
+            vector, k=3, fetch_k=8, lambda_mult=0.5, filter=where))
+
+    calls = []
+    get = vector_db.get
+    monkeypatch.setattr(vector_db, "get", lambda **kwargs: calls.append(kwargs) or get(**kwargs))
+    monkeypatch.setattr(vector_db, "max_marginal_relevance_search_by_vector",
+                        lambda *args, **kwargs: pytest.fail("per-query search"))
+
+    results = filtered_mmr_search(vector_db, filters, k=3, fetch_k=8)
+
+    assert len(calls) == 1
+    assert {company: contents(docs) for company, docs in results.items()} == expected
+    assert all(doc.metadata["company"] == company for company, docs in results.items() for doc in docs)
+
+
+def test_operator_filters_use_per_query_search(vector_db):
+    where = {"$and": [{"mentions_1": True}, {"other": False}]}
+    results = filtered_mmr_search(vector_db, {"LG에너지솔루션": where, "SK온": None}, k=2)
+
+    assert [doc.metadata["company"] for doc in results["LG에너지솔루션"]] == ["LG에너지솔루션"] * 2
+    assert len(results["SK온"]) == 2
+
+
+def test_query_embedding_cache_embeds_missing_queries_once():
+    embeddings = DeterministicFakeEmbedding(size=8)
+    calls = []
+    embed = embeddings.embed_documents
+    object.__setattr__(embeddings, "embed_documents", lambda texts: calls.append(list(texts)) or embed(texts))
+    cache = QueryEmbeddingCache(max_size=2)
+
+    cache.embed(["a", "b", "a"], embeddings)
+    cache.embed(["b", "c"], embeddings)
+
+    assert calls == [["a", "b"], ["c"]]
+    assert (cache.hits, cache.misses) == (2, 3)
@@ -0,0 +1,22 @@
+import logging
+
+from tests.conftest import WATCHLISTS
+
+
+def test_export_errors_are_logged(offline_pipeline, monkeypatch, caplog):
+    from src.agents import stock_price_predictor
+
+    def broken_export(company, dates, values, output_dir="output"):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(stock_price_predictor, "FORECAST_EXPORT", True)
+    monkeypatch.setattr(stock_price_predictor, "export_forecast", broken_export)
+    with caplog.at_level(logging.ERROR):
+        result = stock_price_predictor.predict_stock_prices(
+            {"run_config": {"watchlist": WATCHLISTS[0], "output_dir": str(offline_pipeline / "output")}},
+            max_processes=1,
+        )
+
+    # 저장 실패는 노드 결과에 영향을 주지 않고 오류 로그로 남음
+    assert set(result["forecast_data"]) == set(WATCHLISTS[0])
+    assert "Forecast export failed for 삼성 SDI: disk full" in caplog.text
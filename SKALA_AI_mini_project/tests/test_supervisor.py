@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from tests.conftest import WATCHLISTS
+
+
+@pytest.fixture
+def node_calls(offline_pipeline, monkeypatch):
+    """
+    그래프 노드가 실제로 호출한 에이전트 함수 횟수를 셉니다.
+    """
+    import importlib
+
+    from src.agents import supervisor
+
+    calls = {name: 0 for name in supervisor.NODE_TARGETS}
+    for name, (module_name, attr) in supervisor.NODE_TARGETS.items():
+        module = importlib.import_module(module_name)
+
+        def counted(state, _name=name, _fn=getattr(module, attr)):
+            calls[_name] += 1
+            return _fn(state)
+
+        monkeypatch.setattr(module, attr, counted)
+    return calls
+
+
+def initial_state(tmp_path):
+    return {
+        "company_data": None, "market_data": None, "stock_data": None, "forecast_data": None,
+        "visualization_data": None, "report": None,
+        "run_config": {"watchlist": {**WATCHLISTS[0], **WATCHLISTS[1]}, "report_dir": str(tmp_path / "report"),
+                       "output_dir": str(tmp_path / "output")},
+    }
+
+
+def test_resume_reruns_only_failed_node(offline_pipeline, node_calls, monkeypatch):
+    from src.agents import company_analysis, supervisor
+
+    failing, analyzed = {"LG에너지솔루션"}, []
+    analyze_company = company_analysis.analyze_company
+
+    def flaky(company, **kwargs):
+        analyzed.append(company)
+        if company in failing:
+            raise RuntimeError("boom")
+        return analyze_company(company, **kwargs)
+
+    monkeypatch.setattr(company_analysis, "analyze_company", flaky)
+    first = supervisor.run_graph(initial_state(offline_pipeline))
+    assert "error" in first["company_data"]["LG에너지솔루션"]
+
+    failing.clear()
+    analyzed.clear()
+    for name in node_calls:
+        node_calls[name] = 0
+    second = supervisor.run_graph(initial_state(offline_pipeline))
+
+    # 실패한 노드와 그 결과를 쓰는 보고서만 다시 실행하고, 노드 안에서도 실패한 기업만 다시 분석
+    assert node_calls == {"market_research": 0, "company_analysis": 1, "stock_price_analysis": 0,
+                          "data_visualization": 0, "report_generation": 1}
+    assert analyzed == ["LG에너지솔루션"]
+    assert "error" not in second["company_data"]["LG에너지솔루션"]
+    assert second["run_config"]["run_id"] == first["run_config"]["run_id"]
+
+
+def test_explicit_run_id_resumes_after_date_change(offline_pipeline, node_calls, monkeypatch):
+    from src.agents import supervisor
+
+    supervisor.run_graph(initial_state(offline_pipeline), run_id="nightly")
+    for name in node_calls:
+        node_calls[name] = 0
+
+    strftime = time.strftime
+    monkeypatch.setattr(time, "strftime", lambda fmt, *args: "2099-01-01" if fmt == "%Y-%m-%d" else strftime(fmt, *args))
+    result = supervisor.run_graph(initial_state(offline_pipeline), run_id="nightly")
+
+    assert result["report"]
+    assert not any(node_calls.values())
+
+
+def test_stream_writes_sections_to_run_report_dir(offline_pipeline):
+    from src.agents import supervisor
+
+    state = initial_state(offline_pipeline)
+    supervisor.run_graph(state, stream=True)
+
+    sections = offline_pipeline / "report" / "sections"
+    assert {"company_data.md", "market_data.md", "stock_data.md"} <= set(p.name for p in sections.iterdir())
+    assert not (offline_pipeline / "results" / "final_reports" / "sections").exists()